@@ -19,6 +19,7 @@ class Settings(BaseSettings):
     trending_check_interval: int = Field(default=30, validation_alias="TRENDING_CHECK_INTERVAL")
     poll_interval: int = Field(default=5, validation_alias="POLL_INTERVAL")
     scrape_cooldown_seconds: int = Field(default=120, validation_alias="SCRAPE_COOLDOWN_SECONDS")
+    scrape_workers: int = Field(default=2, validation_alias="SCRAPE_WORKERS")
     healthcheck_ping_url: Optional[str] = Field(default=None, validation_alias="HEALTHCHECK_PING_URL")
     chrome_cdp_url: Optional[str] = Field(default=None, validation_alias="CHROME_CDP_URL")
     ozbargain_db_path: str = Field(default="ozbargain.db", validation_alias="OZBARGAIN_DB_PATH")
@@ -2,11 +2,14 @@ import signal
 import time
 import re
 import random
+import hashlib
 import requests
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Optional, Tuple
-from playwright.sync_api import sync_playwright, Page
+from playwright.sync_api import sync_playwright, Page, TimeoutError as PlaywrightTimeoutError
 from .scraper import BrowserScraper, BOT_WALL_TITLES
 from ..db.manager import StorageManager
 from ..notifier.telegram import TelegramNotifier
@@ -16,17 +19,46 @@ from ..utils.logger import setup_logger
 
 logger = setup_logger("monitor")
 
+# Relative-time parsing: compiled once, with a unit lookup instead of a branch chain
+_RELATIVE_TIME_RE = re.compile(r"(\d+)\s*(sec|min|hour|day)")
+_RELATIVE_TIME_UNITS = {"sec": "seconds", "min": "minutes", "hour": "hours", "day": "days"}
+
 
 class LiveMonitor:
+    # Max live-row fingerprints kept in the LRU before the oldest is evicted
+    SEEN_ROWS_MAX = 5000
+
+    # Soft char budget per batched trending message (Telegram hard limit is 4096)
+    TRENDING_BATCH_CHARS = 3500
+
+    # Ceiling for the adaptive poll interval during idle stretches
+    POLL_INTERVAL_MAX = 30
+
     def __init__(self) -> None:
         self.db = StorageManager()
         self.cdp_url = settings.chrome_cdp_url
         self.scraper = BrowserScraper(headless=True, cdp_url=self.cdp_url)
         self.notifier = TelegramNotifier()
-        self.seen_rows: set = set()  # Cache to avoid re-processing simple rows in same session
+        # LRU of row fingerprints to avoid re-processing simple rows in same session.
+        # Bounded: evicts oldest entries instead of clearing wholesale, and stores
+        # 8-byte digests rather than the full composite key strings.
+        self.seen_rows: OrderedDict = OrderedDict()
         self.last_scraped_times: dict = {}  # url -> datetime
+        self._watched_tags_src: Optional[list] = None
+        self._watched_tags_lower: frozenset = frozenset()
         self._shutdown = False
 
+        # Deal scrapes run off the poll thread so a slow page load never
+        # stalls the /live polling cadence. Sync Playwright objects are bound
+        # to their creating thread, so workers open their own browser session
+        # (CDP connect or local launch) per scrape instead of sharing the
+        # poll thread's page. Each concurrent worker holds one tab in the
+        # shared Chrome, so keep SCRAPE_WORKERS modest.
+        self.scrape_workers = max(1, settings.scrape_workers)
+        self._scrape_executor = ThreadPoolExecutor(
+            max_workers=self.scrape_workers, thread_name_prefix="deal-scrape"
+        )
+
         # Initialize Telegram command listener
         from ..notifier.telegram import TelegramListener
         self.listener = TelegramListener(self.db, self.notifier)
@@ -96,81 +128,86 @@ class LiveMonitor:
                 deal_id = parent_id
                 deal.id = deal_id
 
-        # Final Upsert
-        deal_id = self.db.upsert_live_deal(deal)
-
         # --- Priority Alerts ---
         try:
-            # Skip if expired
             if deal.is_expired:
                 logger.info("Skipping alerts for Expired Deal: %s", deal_id)
-                return deal_id, deal.url
-
-            watched_tags = self.db.get_watched_tags()
-            deal_tags = set(deal.tags)
-
-            # Simple intersection check
-            matches = [tag for tag in watched_tags if tag in deal_tags]
-
-            if matches:
-                # Check DB history to prevent duplicates (Persistence)
-                if not self.db.has_alerted(deal_id, "priority"):
-                    # Fire Priority Alert
-                    deal_link = f"{settings.ozbargain_base_url}/{deal_id}"
-                    alert_text = (
-                        f"<b>🚨 ALERT: Watched Tag Found!</b>\n\n"
-                        f"<b>Matching:</b> {', '.join(matches)}\n"
-                        f"<b>Deal:</b> <a href='{deal_link}'>{deal.title}</a>\n"
-                        f"<b>Price:</b> {deal.price or 'N/A'}"
-                    )
-
-                    if self.notifier.send_message(alert_text, priority=True):
-                        self.db.log_alert(deal_id, "priority")
-                        logger.info(
-                            "Sent Alert for tags: %s", matches, extra={"event_type": "notification", "priority": "high"}
+            else:
+                # Set intersection against the pre-lowercased watch list; deal
+                # tags are lowered here so scraped display-case tags still match.
+                watched_tags = self._get_watched_tags()
+                matches = sorted(watched_tags.intersection(tag.lower() for tag in deal.tags))
+
+                if matches:
+                    # Atomic claim against DB history: a single INSERT OR IGNORE
+                    # decides the winner, so concurrent scrape workers cannot
+                    # both pass a separate has_alerted() read and double-send.
+                    if self.db.try_log_alert(deal_id, "priority"):
+                        # Fire Priority Alert
+                        deal_link = f"{settings.ozbargain_base_url}/{deal_id}"
+                        alert_text = (
+                            f"<b>🚨 ALERT: Watched Tag Found!</b>\n\n"
+                            f"<b>Matching:</b> {', '.join(matches)}\n"
+                            f"<b>Deal:</b> <a href='{deal_link}'>{deal.title}</a>\n"
+                            f"<b>Price:</b> {deal.price or 'N/A'}"
                         )
+
+                        if self.notifier.send_message(alert_text, priority=True):
+                            logger.info(
+                                "Sent Alert for tags: %s", matches, extra={"event_type": "notification", "priority": "high"}
+                            )
+                        else:
+                            # Release the claim so the alert can retry on a later scrape
+                            self.db.remove_alert(deal_id, "priority")
+                            logger.error("Failed to send Alert for tags: %s", matches)
                     else:
-                        logger.error("Failed to send Alert for tags: %s", matches)
-                else:
-                    logger.info("Skip Alert (Already Sent): %s", matches)
+                        logger.info("Skip Alert (Already Sent): %s", matches)
         except Exception as e:
             logger.error("Error checking alerts: %s", e)
 
+        # Final Upsert
+        deal_id = self.db.upsert_live_deal(deal)
+
         # Log
         title_sample = (deal.title or "No Title")[:50]
         logger.info("Upserted Deal: %s - %s", deal_id, title_sample)
 
         return deal_id, deal.url
 
+    @staticmethod
+    def _row_fingerprint(time_str: str, user: str, action: str, url: str) -> bytes:
+        """Returns a compact 8-byte digest identifying a /live row."""
+        return hashlib.blake2s(f"{time_str}|{user}|{action}|{url}".encode(), digest_size=8).digest()
+
+    def _get_watched_tags(self) -> frozenset:
+        """Returns the watched tags as a lowercased frozenset.
+
+        TTL caching (with invalidation on /watch and /unwatch) lives in
+        StorageManager.get_watched_tags; this only rebuilds the lowered
+        frozenset when the underlying cached list changes, so the per-deal
+        match stays a plain set intersection.
+        """
+        tags = self.db.get_watched_tags()
+        if tags is not self._watched_tags_src:
+            self._watched_tags_src = tags
+            self._watched_tags_lower = frozenset(tag.lower() for tag in tags)
+        return self._watched_tags_lower
+
     def parse_relative_time(self, time_str: str) -> datetime:
-        try:
-            now = datetime.now(timezone.utc)
-            time_str = time_str.strip().lower()
-
-            if "now" in time_str:
-                return now
-
-            parts = time_str.split()
-            if len(parts) < 2:
-                return now
-
-            val = int(parts[0])
-            unit = parts[1]
-
-            delta = timedelta(seconds=0)
-            if "sec" in unit:
-                delta = timedelta(seconds=val)
-            elif "min" in unit:
-                delta = timedelta(minutes=val)
-            elif "hour" in unit:
-                delta = timedelta(hours=val)
-            elif "day" in unit:
-                delta = timedelta(days=val)
-
-            return now - delta
-        except Exception as e:
-            logger.warning("Failed to parse relative time %s, using current time: %s", time_str, e)
-            return datetime.now(timezone.utc)
+        """Parses feed strings like '5 min ago' into an absolute UTC datetime."""
+        now = datetime.now(timezone.utc)
+        time_str = time_str.strip().lower()
+
+        if "now" in time_str:
+            return now
+
+        match = _RELATIVE_TIME_RE.search(time_str)
+        if not match:
+            logger.warning("Failed to parse relative time %s, using current time", time_str)
+            return now
+
+        unit = _RELATIVE_TIME_UNITS[match.group(2)]
+        return now - timedelta(**{unit: int(match.group(1))})
 
     def ping_healthcheck(self) -> None:
         """Sends a heartbeat to Healthchecks.io if configured."""
@@ -203,7 +240,15 @@ class LiveMonitor:
             }
         """
         page.evaluate(filter_script)
-        page.wait_for_timeout(1000)
+        # Wait for the Type section to actually expand instead of a fixed sleep
+        try:
+            page.wait_for_function(
+                """() => Array.from(document.querySelectorAll('#filters label'))
+                         .some(l => l.innerText.trim() === 'Deal')""",
+                timeout=5000,
+            )
+        except Exception as e:
+            logger.debug("Type filter section did not expand in time: %s", e)
 
         type_script = """
             () => {
@@ -223,38 +268,82 @@ class LiveMonitor:
             }
         """
         page.evaluate(type_script)
-        page.wait_for_timeout(500)
+        # Wait until the checkboxes reflect the desired state rather than sleeping
+        try:
+            page.wait_for_function(
+                """() => {
+                    const state = {};
+                    for (const l of document.querySelectorAll('#filters label')) {
+                        const input = l.querySelector('input');
+                        if (input) state[l.innerText.trim()] = input.checked;
+                    }
+                    return state['Deal'] === true && !state['Comp'] && !state['Forum'];
+                }""",
+                timeout=5000,
+            )
+        except Exception as e:
+            logger.debug("Filter state not confirmed in time: %s", e)
         logger.info("Filters configured.")
 
-    def _parse_live_row(self, row) -> Optional[Dict]:
-        """Parses a single live feed row into event data, or None if filtered out."""
+    # Single-pass DOM extraction for the /live feed. One evaluate() round-trip
+    # returns every row's cells, instead of ~6 locator calls per row.
+    # Non-Deal rows are dropped in the browser so they never cross the
+    # protocol boundary or touch Python at all; the unfiltered row count
+    # still comes back so stale-session detection sees quiet-but-alive feeds.
+    _LIVE_ROWS_SCRIPT = """
+        () => {
+            const all = Array.from(document.querySelectorAll('tbody#livebody tr')).map(row => {
+                const cells = row.querySelectorAll('td');
+                const link = cells[3] ? cells[3].querySelector('a') : null;
+                const icon = cells[2] ? cells[2].querySelector('i') : null;
+                return {
+                    time_str: cells[0] ? cells[0].textContent.trim() : '',
+                    user: cells[1] ? cells[1].textContent.trim() : '',
+                    action: icon ? (icon.getAttribute('title') || 'Unknown') : 'Unknown',
+                    title: link ? link.textContent.trim() : '',
+                    href: link ? link.getAttribute('href') : null,
+                    type: cells[4] ? cells[4].textContent.trim() : '',
+                };
+            });
+            return { total: all.length, rows: all.filter(r => r.type === 'Deal') };
+        }
+    """
+
+    def _collect_live_rows(self, page: Page) -> tuple:
+        """Extracts the /live feed in a single page.evaluate round-trip.
+
+        Returns (total_row_count, deal_rows): the count covers every row in
+        the feed, while the rows are pre-filtered to Deals in the browser.
+        """
         try:
-            type_str = (row.locator("td:nth-child(5)").text_content() or "").strip()
-            if type_str != "Deal":
-                return None
+            payload = page.evaluate(self._LIVE_ROWS_SCRIPT) or {}
+            return payload.get("total", 0), payload.get("rows", [])
+        except Exception as e:
+            if "Target page, context or browser has been closed" in str(e):
+                raise e
+            logger.error("Failed to collect live rows: %s", e)
+            return 0, []
 
-            subject_link_el = row.locator("td:nth-child(4) a")
-            if subject_link_el.count() == 0:
+    def _parse_live_row(self, row: Dict) -> Optional[Dict]:
+        """Converts a raw extracted live feed row into event data, or None if filtered out."""
+        try:
+            # Type filtering happens in _LIVE_ROWS_SCRIPT; only Deal rows arrive here
+            raw_url = row.get("href")
+            if not raw_url:
                 return None
-            raw_url = subject_link_el.get_attribute("href") or ""
             url = normalize_deal_url(raw_url)
-            title_text = (subject_link_el.text_content() or "").strip()
-
-            time_str = (row.locator("td:nth-child(1)").text_content() or "").strip()
-            user_str = (row.locator("td:nth-child(2)").text_content() or "").strip()
-            action_el = row.locator("td:nth-child(3) i")
-            action_str = action_el.get_attribute("title") or "Unknown"
 
+            time_str = row.get("time_str", "")
             timestamp = self.parse_relative_time(time_str).isoformat()
 
             return {
-                "title": title_text,
+                "title": row.get("title", ""),
                 "original_url": url,
                 "timestamp": timestamp,
                 "time_str": time_str,
-                "user": user_str,
-                "action": action_str,
-                "type": type_str,
+                "user": row.get("user", ""),
+                "action": row.get("action", "Unknown"),
+                "type": row.get("type", ""),
             }
         except Exception as e:
             logger.debug("Failed to parse row: %s", e)
@@ -284,30 +373,64 @@ class LiveMonitor:
     def _check_and_alert_trending(self) -> None:
         """Performs scheduled trending deals check and sends alerts."""
         logger.info("Performing scheduled trending deals check...")
-        candidates = self.db.get_trending_deals(
-            hours=24, limit=-1, min_score=self.min_heat_score
+        # Already-alerted deals are filtered out by the LEFT JOIN inside the query
+        fresh = self.db.get_trending_deals(
+            hours=24, limit=-1, min_score=self.min_heat_score, exclude_alert_type="trending"
         )
+        if not fresh:
+            return
 
-        for deal in candidates:
-            deal_id = deal["resolved_id"]
-            if not self.db.has_alerted(deal_id, "trending"):
-                deal_link = f"{settings.ozbargain_base_url}/{deal_id}"
-                msg = (
-                    f"<b>🔥 POPULAR DEAL!</b> (Score: {deal['heat_score']})\n\n"
-                    f"<a href='{deal_link}'>{deal['title']}</a>\n"
-                    f"<b>Price:</b> {deal['price']}\n"
-                    f"<b>Votes:</b> {deal['upvotes']} | <b>Comments:</b> {deal['comment_count']}"
+        # Batch all fresh deals into as few messages as possible (Telegram caps
+        # a message at 4096 chars), instead of one send per deal.
+        batch: list = []
+        batch_ids: list = []
+        batch_len = 0
+
+        def _flush() -> None:
+            nonlocal batch, batch_ids, batch_len
+            if not batch:
+                return
+            msg = "<b>🔥 POPULAR DEALS!</b>\n\n" + "\n\n".join(batch)
+            if self.notifier.send_message(msg, priority=False):
+                self.db.log_alerts(batch_ids, "trending")
+                logger.info(
+                    "Sent Trending Alert batch (%d deals)",
+                    len(batch_ids),
+                    extra={"event_type": "notification", "priority": "normal"},
                 )
+            else:
+                logger.error("Failed to send Trending Alert batch (%d deals)", len(batch_ids))
+            batch, batch_ids, batch_len = [], [], 0
 
-                if self.notifier.send_message(msg, priority=False):
-                    self.db.log_alert(deal_id, "trending")
-                    logger.info(
-                        "Sent Trending Alert: %s",
-                        deal["title"],
-                        extra={"event_type": "notification", "priority": "normal"},
-                    )
-                else:
-                    logger.error("Failed to send Trending Alert: %s", deal["title"])
+        for deal in fresh:
+            deal_id = deal["resolved_id"]
+            deal_link = f"{settings.ozbargain_base_url}/{deal_id}"
+            entry = (
+                f"<a href='{deal_link}'>{deal['title']}</a> (Score: {deal['heat_score']})\n"
+                f"<b>Price:</b> {deal['price']}\n"
+                f"<b>Votes:</b> {deal['upvotes']} | <b>Comments:</b> {deal['comment_count']}"
+            )
+            if batch and batch_len + len(entry) > self.TRENDING_BATCH_CHARS:
+                _flush()
+            batch.append(entry)
+            batch_ids.append(deal_id)
+            batch_len += len(entry)
+
+        _flush()
+
+    def _submit_scrape(self, url: str, event_data: Dict, timeout: int = 30000) -> None:
+        """Queues a deal scrape on the background executor."""
+        future = self._scrape_executor.submit(
+            self.process_deal, url, browser=None, event_data=event_data, timeout=timeout
+        )
+        future.add_done_callback(self._log_scrape_result)
+
+    @staticmethod
+    def _log_scrape_result(future: Future) -> None:
+        try:
+            future.result()
+        except Exception as e:
+            logger.error("Background scrape failed: %s", e)
 
     @contextmanager
     def _browser_session(self):
@@ -331,7 +454,15 @@ class LiveMonitor:
                 self.scraper.setup_page_routing(page)
                 logger.info("Navigating to /live...")
                 page.goto(f"{settings.ozbargain_base_url}/live", timeout=60000, wait_until="domcontentloaded")
-                page.wait_for_selector("tbody#livebody", timeout=30000)
+                # Wait for an actual event row, not just the (possibly empty)
+                # tbody shell; the /live page keeps sockets open for updates so
+                # any networkidle-style wait would never settle.
+                try:
+                    page.wait_for_selector("tbody#livebody tr", state="attached", timeout=15000)
+                except PlaywrightTimeoutError:
+                    # Quiet periods can leave the feed briefly empty; as long as
+                    # the tbody rendered, the poll loop will pick rows up later.
+                    page.wait_for_selector("tbody#livebody", state="attached", timeout=5000)
                 yield browser, page
             finally:
                 browser.close()
@@ -342,6 +473,7 @@ class LiveMonitor:
         last_trending_check = datetime.now(timezone.utc) - timedelta(minutes=self.trending_check_interval)
         last_success_time = datetime.now(timezone.utc)
         session_start_time = datetime.now(timezone.utc)
+        idle_ticks = 0
 
         while not self._shutdown:
             # Periodic session refresh (every 4 hours)
@@ -356,10 +488,11 @@ class LiveMonitor:
                     last_trending_check = datetime.now(timezone.utc)
 
                 # --- Deal Stream Check ---
-                rows = page.locator("tbody#livebody tr").all()
+                total_rows, rows = self._collect_live_rows(page)
 
-                # Stale Session Detection
-                if rows:
+                # Stale Session Detection: judged on the unfiltered feed, so a
+                # stretch of non-Deal activity doesn't look like a dead session
+                if total_rows:
                     last_success_time = datetime.now(timezone.utc)
                 elif datetime.now(timezone.utc) - last_success_time > timedelta(minutes=10):
                     logger.warning(
@@ -368,6 +501,7 @@ class LiveMonitor:
                     break
 
                 recent_rows = rows[:20]
+                new_row_count = 0
                 for row in recent_rows:
                     try:
                         event_data = self._parse_live_row(row)
@@ -380,16 +514,20 @@ class LiveMonitor:
                         user_str = event_data["user"]
                         action_str = event_data["action"]
 
-                        # Track unique /live rows by composite key
-                        row_key = f"{time_str}|{user_str}|{action_str}|{url}"
+                        # Track unique /live rows by a compact fingerprint of the composite key
+                        row_key = self._row_fingerprint(time_str, user_str, action_str, url)
                         if row_key in self.seen_rows:
+                            self.seen_rows.move_to_end(row_key)
                             continue
-                        self.seen_rows.add(row_key)
+                        self.seen_rows[row_key] = None
+                        if len(self.seen_rows) > self.SEEN_ROWS_MAX:
+                            self.seen_rows.popitem(last=False)
+                        new_row_count += 1
 
                         if not self._should_scrape(url, title_text):
                             continue
 
-                        self.process_deal(url, browser=browser, event_data=event_data, timeout=30000)
+                        self._submit_scrape(url, event_data)
 
                     except Exception as e:
                         if "Target page, context or browser has been closed" in str(e):
@@ -403,10 +541,6 @@ class LiveMonitor:
                         k: v for k, v in self.last_scraped_times.items() if v > cutoff
                     }
 
-                if len(self.seen_rows) > 5000:
-                    self.seen_rows.clear()
-                    logger.info("Cleared seen_rows cache (exceeded 5000 entries)")
-
                 # --- Tab Leak Guard ---
                 # Each deal scrape opens a new tab in the shared Chrome instance and
                 # closes it via page.close(). If close() is skipped (e.g. an exception
@@ -416,7 +550,7 @@ class LiveMonitor:
                 try:
                     all_pages = [p for ctx in browser.contexts for p in ctx.pages]
                     tab_count = len(all_pages)
-                    if tab_count > 3:  # /live page + up to 2 in-flight scrapes is normal
+                    if tab_count > self.scrape_workers + 1:  # /live page + one tab per in-flight scrape is normal
                         logger.warning(
                             "Tab leak detected: %d open tabs in Chrome. Closing stale tabs.",
                             tab_count,
@@ -435,13 +569,18 @@ class LiveMonitor:
                 except Exception as tab_err:
                     logger.debug("Tab leak guard error: %s", tab_err)
 
+                # --- Adaptive poll backoff ---
+                # Most off-peak ticks find nothing new; double the sleep on
+                # each empty tick (capped) and snap back to base on activity.
+                idle_ticks = 0 if new_row_count else min(idle_ticks + 1, 10)
+
             except Exception as loop_e:
                 if "Target page, context or browser has been closed" in str(loop_e):
                     raise loop_e
                 logger.error("Inner loop error: %s", loop_e)
 
             self.ping_healthcheck()
-            time.sleep(self.poll_interval)
+            time.sleep(min(self.poll_interval * (2**idle_ticks), self.POLL_INTERVAL_MAX))
 
     def run(self) -> None:
         logger.info("Starting Live Monitor...", extra={"event_type": "startup"})
@@ -459,6 +598,10 @@ class LiveMonitor:
                 logger.info("Restarting browser session in 15 seconds...")
                 time.sleep(15)
 
+        self._scrape_executor.shutdown(wait=False)
+        # Flush buffered history snapshots before the process exits
+        self.db.close()
+
 
 if __name__ == "__main__":
     monitor = LiveMonitor()
@@ -1,6 +1,10 @@
+import hashlib
 import re
 import requests
 import json
+import threading
+from collections import OrderedDict
+from dataclasses import replace
 from datetime import datetime, timezone
 from zoneinfo import ZoneInfo
 import random
@@ -10,17 +14,46 @@ from typing import Optional
 from bs4 import BeautifulSoup
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-from playwright.sync_api import sync_playwright, Page
+from playwright.sync_api import (
+    sync_playwright,
+    Page,
+    Error as PlaywrightError,
+    TimeoutError as PlaywrightTimeoutError,
+)
 
 from ..utils.logger import setup_logger
+from ..utils.ratelimit import RateLimiter
+from ..utils.urls import normalize_deal_url
 from ..config import settings
 from ..models import DealResult
 
 logger = setup_logger("scraper")
 
+# Prefer the C-accelerated lxml parser when installed; html.parser is the
+# pure-Python fallback so the scraper still works without the optional dep.
+try:
+    import lxml  # noqa: F401
+
+    _BS4_PARSER = "lxml"
+except ImportError:
+    _BS4_PARSER = "html.parser"
+
 # Titles that indicate a bot-wall / security challenge rather than real content
 BOT_WALL_TITLES = frozenset({"OzBargain", "www.ozbargain.com.au", "Performing security verification"})
 
+# Activity feed actions worth archiving (posts, comments, replies)
+_ACTIVITY_ACTION_RE = re.compile(r"replied to|commented on|posted")
+
+# Hot-path patterns compiled once at import instead of per call
+_NODE_RE = re.compile(r"node/(\d+)")
+_PAGE_RE = re.compile(r"page=(\d+)")
+_COUNT_RE = re.compile(r"\((\d+)\)")
+_PRICE_RE = re.compile(r"\$\d+(?:,\d+)*(?:\.\d+)?")
+_POSTED_RE = re.compile(r"on (\d{2}/\d{2}/\d{4} - \d{2}:\d{2})")
+# "Comments (178)" header, preferring the id="comments" anchor
+_COMMENTS_HEADER_RE = re.compile(r'id="comments"[^>]*>[^<(]*\((\d+)\)', re.I)
+_COMMENTS_H2_RE = re.compile(r"<h2[^>]*>[^<]*Comments[^<]*\((\d+)\)", re.I)
+
 # Default User-Agent for FastScraper HTTP requests
 _DEFAULT_UA = (
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
@@ -28,8 +61,19 @@ _DEFAULT_UA = (
 )
 
 
-def _build_retry_session() -> requests.Session:
-    """Creates a requests.Session with retry strategy for resilient HTTP fetching."""
+def _url_fingerprint(url: str) -> bytes:
+    """Compact 8-byte digest for seen-URL bookkeeping (same scheme as the
+    monitor's row fingerprints): ~28 bytes per set entry instead of holding
+    every full URL string for the life of a long crawl."""
+    return hashlib.blake2s(url.encode("utf-8", "replace"), digest_size=8).digest()
+
+
+def _build_retry_session(pool_size: int = 20) -> requests.Session:
+    """Creates a requests.Session with retry strategy and a sized connection pool.
+
+    pool_size should cover the maximum expected concurrent callers so threaded
+    fan-outs reuse pooled keep-alive connections instead of opening new sockets.
+    """
     session = requests.Session()
     session.headers["User-Agent"] = _DEFAULT_UA
     retry = Retry(
@@ -38,39 +82,105 @@ def _build_retry_session() -> requests.Session:
         status_forcelist=[429, 500, 502, 503, 504],
         allowed_methods=["HEAD", "GET", "OPTIONS"],
     )
-    adapter = HTTPAdapter(max_retries=retry)
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
     session.mount("https://", adapter)
     session.mount("http://", adapter)
     return session
 
 
+# Process-wide session shared by all FastScraper instances. requests.Session
+# is thread-safe for plain GETs, so threaded fan-outs (e.g. the activity
+# fetcher's worker pool) all draw keep-alive connections from one pool.
+_shared_session: Optional[requests.Session] = None
+_shared_session_lock = threading.Lock()
+
+
+def _get_shared_session() -> requests.Session:
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = _build_retry_session()
+        return _shared_session
+
+
+# Process-wide cap on concurrent in-flight requests to ozbargain, so threaded
+# fan-outs (activity fetcher, bulk recovery) can't stampede the host no matter
+# how many workers the caller spins up.
+_HOST_CONCURRENCY = 16
+_host_semaphore = threading.BoundedSemaphore(_HOST_CONCURRENCY)
+
+# Token bucket pacing all HTTP requests to ozbargain: bursts of up to 10
+# proceed immediately, sustained load is smoothed to ~2 req/s. Server-side
+# pressure (429 + Retry-After) is already honoured by the session's Retry.
+_rate_limiter = RateLimiter(rate=2.0, capacity=10)
+
+
 class FastScraper:
     """
     Lightweight HTML parser using standard requests + BeautifulSoup.
     Extremely fast and low overhead (does not spawn Playwright/Chromium).
     """
 
-    def __init__(self):
+    # Process-wide TTL-LRU of successful scrapes keyed on the normalized URL,
+    # shared across instances (and therefore worker threads) like the session.
+    CACHE_MAX = 4096
+    CACHE_TTL_SECONDS = 3600
+
+    _cache: "OrderedDict[str, tuple]" = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    def __init__(self, session: Optional[requests.Session] = None):
         self.base_url = settings.ozbargain_base_url
-        self.session = _build_retry_session()
+        self.session = session or _get_shared_session()
+
+    @classmethod
+    def _cache_get(cls, key: str) -> Optional[DealResult]:
+        with cls._cache_lock:
+            entry = cls._cache.get(key)
+            if entry is None:
+                return None
+            cached_at, result = entry
+            if time.monotonic() - cached_at > cls.CACHE_TTL_SECONDS:
+                del cls._cache[key]
+                return None
+            cls._cache.move_to_end(key)
+            # Fresh tags list so callers mutating the result can't poison the cache
+            return replace(result, tags=list(result.tags))
+
+    @classmethod
+    def _cache_put(cls, key: str, result: DealResult) -> None:
+        with cls._cache_lock:
+            cls._cache[key] = (time.monotonic(), replace(result, tags=list(result.tags)))
+            cls._cache.move_to_end(key)
+            if len(cls._cache) > cls.CACHE_MAX:
+                cls._cache.popitem(last=False)
 
     def scrape_deal_fast(self, url: str) -> DealResult:
         """
         Fast version of scrape_deal_page using requests instead of Playwright.
-        Much more efficient for mass scraping.
+        Much more efficient for mass scraping. Successful results are served
+        from a process-wide cache for up to an hour.
         """
+        cache_key = normalize_deal_url(url)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            r = self.session.get(url, timeout=15)
+            with _host_semaphore, _rate_limiter:
+                r = self.session.get(url, timeout=15)
             r.raise_for_status()
-            html = r.text
+            # Raw bytes: lxml sniffs the charset itself, so skipping requests'
+            # text decode avoids materialising a second copy of every page.
+            html = r.content
 
             # Simple fallback ID extraction
             deal_id = "unknown"
-            match = re.search(r"node/(\d+)", r.url)
+            match = _NODE_RE.search(r.url)
             if match:
                 deal_id = f"node/{match.group(1)}"
 
-            soup = BeautifulSoup(html, "html.parser")
+            soup = BeautifulSoup(html, _BS4_PARSER)
 
             # Title
             if soup.title and soup.title.string:
@@ -94,8 +204,16 @@ class FastScraper:
             if coupon_el:
                 coupon = coupon_el.get_text(strip=True)
 
-            # Tags
-            tags = [a.get_text(strip=True) for a in soup.select("div.taxonomy a")]
+            # Tags (categories, tags, and brands — same scope as the browser
+            # scraper; dict.fromkeys dedupes while preserving order)
+            tags = list(
+                dict.fromkeys(
+                    a.get_text(strip=True)
+                    for a in soup.select(
+                        "div.taxonomy a[href^='/cat/'], div.taxonomy a[href^='/tag/'], div.taxonomy a[href^='/brand/']"
+                    )
+                )
+            )
 
             # Linked Comment
             linked_comment = None
@@ -105,31 +223,26 @@ class FastScraper:
             # Format 1: /node/123#comment-456
             # Format 2: /comment/456
 
-            if "#comment-" in r.url:
-                try:
-                    linked_comment_id = r.url.split("#comment-")[1]
-                    linked_comment_id = f"comment-{linked_comment_id}"
-                except Exception:
-                    logger.debug("Failed to split comment ID from URL: %s", r.url)
-            elif "/comment/" in r.url:
-                try:
-                    # Clean query params if any
-                    clean_url = r.url.split("?")[0]
-                    part = clean_url.split("/comment/")[1]
-                    # handle /redir or trailing slash
-                    part = part.replace("/redir", "").replace("/", "")
-                    linked_comment_id = f"comment-{part}"
-                except Exception:
-                    logger.debug("Failed to extract comment ID from resolved URL part: %s", r.url)
+            # partition/removesuffix do one scan and no throwaway list, unlike
+            # the split()[1] chains they replace
+            _, found, fragment = r.url.partition("#comment-")
+            if found:
+                linked_comment_id = f"comment-{fragment}"
+            else:
+                _, found, tail = r.url.partition("/comment/")
+                if found:
+                    # Clean query params, /redir and trailing slashes
+                    part = tail.partition("?")[0].removesuffix("/redir").strip("/")
+                    if part:
+                        linked_comment_id = f"comment-{part}"
 
             # Fallback: Check input URL if resolved URL is weird
-            if not linked_comment_id and "/comment/" in url:
-                try:
-                    clean_url = url.split("?")[0]
-                    part = clean_url.split("/comment/")[1].split("/")[0]
-                    linked_comment_id = f"comment-{part}"
-                except Exception:
-                    logger.debug("Failed to extract comment ID from fallback URL: %s", url)
+            if not linked_comment_id:
+                _, found, tail = url.partition("/comment/")
+                if found:
+                    part = tail.partition("?")[0].partition("/")[0]
+                    if part:
+                        linked_comment_id = f"comment-{part}"
 
             if linked_comment_id:
                 # Find the specific comment div
@@ -158,10 +271,11 @@ class FastScraper:
                         if "commentCount" in data:
                             comment_count = int(data["commentCount"])
                             break
-                except Exception:
+                except (json.JSONDecodeError, TypeError, ValueError):
+                    # Malformed LD+JSON block or non-numeric count; try the next one
                     pass
 
-            return DealResult(
+            result = DealResult(
                 id=deal_id,
                 url=r.url,
                 title=title,
@@ -178,10 +292,88 @@ class FastScraper:
                 action="scraped",
                 type="deal",
             )
+            # Only successful scrapes are cached; errors and bot walls retry
+            self._cache_put(cache_key, result)
+            return result
 
         except Exception as e:
             return DealResult(error=str(e), url=url)
 
+    def get_user_activity(self, user_id: str, max_items: int = 50):
+        """
+        Crawls a user's public activity feed via plain paginated HTML
+        (/user/<id>?page=N) instead of driving a browser through infinite
+        scroll. Yields {"text", "url"} dicts, same shape as the Playwright
+        variant on BrowserScraper, which remains the fallback when the feed
+        is behind a bot wall.
+        """
+        count = 0
+        items_seen = set()
+        page_num = 0
+
+        while count < max_items:
+            page_url = f"{self.base_url}/user/{user_id}"
+            if page_num:
+                page_url = f"{page_url}?page={page_num}"
+
+            try:
+                with _host_semaphore, _rate_limiter:
+                    r = self.session.get(page_url, timeout=15)
+                r.raise_for_status()
+            except Exception as e:
+                logger.error("Failed to fetch activity page %s: %s", page_url, e)
+                return
+
+            soup = BeautifulSoup(r.content, _BS4_PARSER)
+
+            title = soup.title.string.strip() if (soup.title and soup.title.string) else ""
+            if title.replace(" - OzBargain", "").strip() in BOT_WALL_TITLES or title in BOT_WALL_TITLES:
+                logger.warning(
+                    "Bot wall on activity feed for %s; use the browser crawler instead",
+                    user_id,
+                    extra={"event_type": "security_challenge", "challenge_type": "cloudflare"},
+                )
+                return
+
+            divs = soup.select("div.activities > div")
+            if not divs:
+                logger.info("End of feed reached at page %d.", page_num)
+                return
+
+            for div in divs:
+                if count >= max_items:
+                    return
+
+                action_el = div.select_one(".right .action")
+                if action_el is None:
+                    continue
+
+                text = action_el.get_text(" ", strip=True)
+                if not _ACTIVITY_ACTION_RE.search(text):
+                    continue
+
+                links = action_el.find_all("a")
+                if not links:
+                    continue
+                href = str(links[-1].get("href") or "")
+                if not href:
+                    continue
+
+                full_url = self.base_url + href if href.startswith("/") else href
+                fingerprint = _url_fingerprint(full_url)
+                if fingerprint in items_seen:
+                    continue
+
+                items_seen.add(fingerprint)
+                count += 1
+                yield {"text": text, "url": full_url}
+
+            # Follow the pager rather than guessing page numbers blindly
+            if soup.select_one("ul.pager li.pager-next a") is None:
+                logger.info("End of feed reached at page %d.", page_num)
+                return
+            page_num += 1
+
 
 class BrowserScraper:
     """
@@ -189,26 +381,134 @@ class BrowserScraper:
     and bypassing bot protection/challenges.
     """
 
+    # Collects all activity rows past a given offset in one evaluate: a scroll
+    # tick costs one CDP round-trip instead of several locator calls per item.
+    _ACTIVITY_ITEMS_SCRIPT = """
+    (start) => {
+        const divs = [...document.querySelectorAll('div.activities > div')];
+        const items = divs.slice(start).map((d) => {
+            const action = d.querySelector('.right .action');
+            if (!action) return null;
+            const links = action.querySelectorAll('a');
+            const last = links[links.length - 1];
+            return {
+                text: (action.textContent || '').trim(),
+                href: last ? last.getAttribute('href') : null,
+            };
+        }).filter(Boolean);
+        return { total: divs.length, items };
+    }
+    """
+
+    # Reads every deal-page field in one evaluate so extraction costs a single
+    # CDP round-trip instead of ~20 locator calls. Nulls mean "not present";
+    # parsing/cleanup of the raw strings happens Python-side.
+    _DEAL_DATA_SCRIPT = """
+    (targetCommentId) => {
+        const text = (el) => (el && el.textContent != null) ? el.textContent.trim() : null;
+
+        const node = document.querySelector('div.node');
+        const submitted = document.querySelector('div.submitted');
+        const coupon = document.querySelector('div.couponcode');
+
+        return {
+            title: text(document.querySelector('h1#title')) ?? text(document.querySelector('h1')),
+            h2Fallback: text(document.querySelector('h2')),
+            isExpired: !!(node && [...node.querySelectorAll('span')].some(
+                (s) => (s.textContent || '').toLowerCase().includes('expired')
+            )),
+            submittedText: text(submitted),
+            externalDomain: submitted ? text(submitted.querySelector("a[href^='/goto/']")) : null,
+            couponStrongs: coupon
+                ? [...coupon.querySelectorAll('strong')].map((el) => (el.textContent || '').trim())
+                : null,
+            couponText: text(coupon),
+            description: text(document.querySelector('div.node-content'))
+                ?? text(document.querySelector('div.content')),
+            tags: [...document.querySelectorAll(
+                "div.taxonomy a[href^='/cat/'], div.taxonomy a[href^='/tag/'], div.taxonomy a[href^='/brand/']"
+            )].map((a) => (a.textContent || '').trim()),
+            upvotes: text(document.querySelector('div.n-vote span.voteup span')),
+            downvotes: text(document.querySelector('div.n-vote span.votedown span')),
+            linkedComment: targetCommentId
+                ? text((document.getElementById(targetCommentId) || document.createElement('div'))
+                    .querySelector('.content'))
+                : null,
+        };
+    }
+    """
+
     def __init__(self, headless: bool = True, cdp_url: Optional[str] = None):
         self.headless = headless
         self.cdp_url = cdp_url or settings.chrome_cdp_url
         self.base_url = settings.ozbargain_base_url
+        # Persistent browser state, one per thread: sync Playwright objects are
+        # bound to the thread that created them, so each worker keeps its own
+        # long-lived browser instead of paying a cold start per scrape.
+        self._local = threading.local()
+
+    def _ensure_browser(self):
+        """Returns this thread's persistent (browser, context), creating them on first use."""
+        state = self._local
+        if getattr(state, "browser", None) is None:
+            state.pw = sync_playwright().start()
+            browser = None
+            if self.cdp_url:
+                logger.info("Connecting to Chrome via CDP: %s", self.cdp_url)
+                try:
+                    browser = state.pw.chromium.connect_over_cdp(self.cdp_url)
+                except Exception as cdp_e:
+                    logger.warning("CDP Connection failed: %s. Falling back to local browser.", cdp_e)
+            if browser is None:
+                browser = state.pw.chromium.launch(headless=self.headless)
+            state.browser = browser
+            # Reuse the existing context on CDP connections (shares cookies
+            # with the long-lived Chrome); otherwise create one.
+            state.context = browser.contexts[0] if browser.contexts else browser.new_context()
+        return state.browser, state.context
+
+    def close(self) -> None:
+        """Closes this thread's persistent browser, if one was created."""
+        state = self._local
+        browser = getattr(state, "browser", None)
+        if browser is None:
+            return
+        try:
+            browser.close()
+        except Exception as close_e:
+            logger.debug("Error closing browser: %s", close_e)
+        try:
+            state.pw.stop()
+        except Exception as stop_e:
+            logger.debug("Error stopping Playwright: %s", stop_e)
+        state.browser = None
+        state.context = None
+        state.pw = None
+
+    def __enter__(self) -> "BrowserScraper":
+        self._ensure_browser()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
 
     def setup_page_routing(self, page: Page) -> None:
         """
-        Configure request interception to block images, fonts, media, and third-party ad/tracking domains.
+        Configure request interception to block images, stylesheets, fonts, media, and
+        third-party ad/tracking domains.
         This significantly reduces memory footprint, CPU load, and loading time.
         """
         def route_handler(route):
             req = route.request
             url_lower = req.url.lower()
 
-            # Block media/fonts
-            if req.resource_type in ("image", "font", "media"):
+            # Block media/styling. We only read DOM structure and text, so CSS is
+            # dead weight for both the /live poll loop and deal scrapes.
+            if req.resource_type in ("image", "stylesheet", "font", "media"):
                 try:
                     route.abort()
-                except Exception:
-                    pass
+                except PlaywrightError:
+                    pass  # Page/route already gone; nothing to abort
                 return
 
             # Block third-party ad and tracking domains
@@ -221,14 +521,14 @@ class BrowserScraper:
             if any(pattern in url_lower for pattern in blocked_patterns):
                 try:
                     route.abort()
-                except Exception:
-                    pass
+                except PlaywrightError:
+                    pass  # Page/route already gone; nothing to abort
                 return
 
             try:
                 route.continue_()
-            except Exception:
-                pass
+            except PlaywrightError:
+                pass  # Page closed mid-flight; the request no longer matters
 
         try:
             page.route("**/*", route_handler)
@@ -245,9 +545,21 @@ class BrowserScraper:
         items_seen = set()
 
         with sync_playwright() as p:
-            browser = p.chromium.launch(headless=self.headless)
+            # Share the long-lived Chrome via CDP when configured (same pattern
+            # as the monitor and deal scrapes) instead of launching a fresh
+            # Chromium per crawl.
+            browser = None
+            if self.cdp_url:
+                logger.info("Connecting to Chrome via CDP: %s", self.cdp_url)
+                try:
+                    browser = p.chromium.connect_over_cdp(self.cdp_url)
+                except Exception as cdp_e:
+                    logger.warning("CDP Connection failed: %s. Falling back to local browser.", cdp_e)
+            if browser is None:
+                browser = p.chromium.launch(headless=self.headless)
             try:
                 page = browser.new_page()
+                self.setup_page_routing(page)
 
                 logger.info("Loading profile: %s", base_user_url)
                 try:
@@ -259,53 +571,43 @@ class BrowserScraper:
 
                 last_height = page.evaluate("document.body.scrollHeight")
                 retries = 0
+                dom_offset = 0
 
                 while count < max_items:
-                    # 1. Yield visible items
-                    # We re-query all items because the list grows.
-                    # Optimization: In heavy infinite scroll, scraping 1000 items from DOM repeatedly is slow.
-                    # However, Playwright locator.all() is reasonably fast for 100s.
-                    divs = page.locator("div.activities > div").all()
+                    # 1. Yield new items. One evaluate returns every row past
+                    # the last-seen offset; filtering happens in Python.
+                    try:
+                        payload = page.evaluate(self._ACTIVITY_ITEMS_SCRIPT, dom_offset)
+                    except Exception as eval_e:
+                        logger.error("Error collecting activity items: %s", eval_e)
+                        payload = {"total": dom_offset, "items": []}
+                    dom_offset = payload["total"]
 
-                    for item in divs:
+                    for entry in payload["items"]:
                         if count >= max_items:
                             break
 
-                        try:
-                            # Check structure
-                            if item.locator(".right .action").count() == 0:
-                                continue
-
-                            action_el = item.locator(".right .action")
-                            text = (action_el.text_content() or "").strip()
-
-                            # Filter types
-                            if not ("replied to" in text or "commented on" in text or "posted" in text):
-                                continue
+                        text = entry["text"]
+                        href = entry["href"]
 
-                            # Link
-                            links = action_el.locator("a").all()
-                            if not links:
-                                continue
-
-                            # Last link usually deal/comment
-                            href = links[-1].get_attribute("href")
-                            if not href:
-                                continue
+                        # Filter types
+                        if not _ACTIVITY_ACTION_RE.search(text):
+                            continue
 
-                            full_url = self.base_url + href if href.startswith("/") else href
+                        # Last link usually deal/comment
+                        if not href:
+                            continue
 
-                            if full_url in items_seen:
-                                continue
+                        full_url = self.base_url + href if href.startswith("/") else href
 
-                            items_seen.add(full_url)
-                            count += 1
+                        fingerprint = _url_fingerprint(full_url)
+                        if fingerprint in items_seen:
+                            continue
 
-                            yield {"text": text, "url": full_url}
+                        items_seen.add(fingerprint)
+                        count += 1
 
-                        except Exception as item_e:
-                            logger.error("Error processing activity item: %s", item_e)
-                            continue
+                        yield {"text": text, "url": full_url}
 
                     if count >= max_items:
                         break
@@ -423,47 +725,67 @@ class BrowserScraper:
         has_counted_via_dom = False
 
         # 1. Check for Pagination (Exact Count Strategy)
-        # Scan all pager links to find the max 'page=X' index
-        pager_links = page.locator("ul.pager a")
+        # One evaluate returns every pager href; the max 'page=X' index is
+        # found in Python instead of a get_attribute round-trip per link.
         max_page_idx = -1
         target_href = None
+        try:
+            hrefs = page.evaluate(
+                "() => [...document.querySelectorAll('ul.pager a')].map((a) => a.getAttribute('href'))"
+            )
+        except Exception as pager_e:
+            logger.debug("Failed to collect pager links: %s", pager_e)
+            hrefs = []
 
-        if pager_links.count() > 0:
-            for i in range(pager_links.count()):
-                href = pager_links.nth(i).get_attribute("href")
-                if href:
-                    match = re.search(r"page=(\d+)", href)
-                    if match:
-                        idx = int(match.group(1))
-                        if idx > max_page_idx:
-                            max_page_idx = idx
-                            target_href = href
+        for href in hrefs:
+            if href:
+                match = _PAGE_RE.search(href)
+                if match:
+                    idx = int(match.group(1))
+                    if idx > max_page_idx:
+                        max_page_idx = idx
+                        target_href = href
 
         if max_page_idx > -1:
             # Found a multi-page thread
             base_count = max_page_idx * 100
 
-            try:
-                # Construct absolute URL for last page
-                assert target_href is not None  # guaranteed by the loop above
-                if target_href.startswith("?"):
-                    clean_url = url.split("?")[0]
-                    target_url = f"{clean_url}{target_href}"
-                elif target_href.startswith("/"):
-                    target_url = f"{self.base_url}{target_href}"
-                else:
-                    target_url = target_href
-
-                # Navigate to last page
-                page.goto(target_url, wait_until="domcontentloaded")
-                page.wait_for_selector("div.comment", timeout=5000, state="attached")
+            # Construct absolute URL for last page
+            assert target_href is not None  # guaranteed by the loop above
+            if target_href.startswith("?"):
+                clean_url = url.split("?")[0]
+                target_url = f"{clean_url}{target_href}"
+            elif target_href.startswith("/"):
+                target_url = f"{self.base_url}{target_href}"
+            else:
+                target_url = target_href
 
-                remainder = page.locator("div.comment").count()
+            # Count the remainder from the last page over plain HTTP first —
+            # cheaper than a full browser navigation and render.
+            remainder = 0
+            try:
+                with _host_semaphore, _rate_limiter:
+                    r = _get_shared_session().get(target_url, timeout=15)
+                r.raise_for_status()
+                remainder = len(BeautifulSoup(r.content, _BS4_PARSER).select("div.comment"))
+            except Exception as http_e:
+                logger.debug("HTTP last-page count failed, falling back to navigation: %s", http_e)
+
+            if remainder > 0:
                 comment_count = base_count + remainder
                 has_counted_via_dom = True
-            except Exception as nav_e:
-                logger.error("Error navigating to last page: %s", nav_e)
-                comment_count = base_count
+            else:
+                # Fallback: bot wall or empty HTTP response; use the browser
+                try:
+                    page.goto(target_url, wait_until="domcontentloaded")
+                    page.wait_for_selector("div.comment", timeout=5000, state="attached")
+
+                    remainder = page.locator("div.comment").count()
+                    comment_count = base_count + remainder
+                    has_counted_via_dom = True
+                except Exception as nav_e:
+                    logger.error("Error navigating to last page: %s", nav_e)
+                    comment_count = base_count
 
         # 2. Single Page Count (Fallback or Default)
         if not has_counted_via_dom:
@@ -472,25 +794,18 @@ class BrowserScraper:
                 comment_count = dom_count
                 has_counted_via_dom = True
 
-        # 3. Last Resort: Text Search
+        # 3. Last Resort: "Comments (178)" header. One content() fetch and a
+        # regex beat a has-text locator, which walks the whole DOM in-browser.
         if not has_counted_via_dom or comment_count == 0:
-            # Scope to the main deal node if possible
-            deal_containter = page.locator("div.node-full").first
-            if deal_containter.count() == 0:
-                deal_containter = page.locator("div.node").first
-            if deal_containter.count() == 0:
-                deal_containter = page.locator("body")
-
-            # Try Header "Comments (178)"
-            header = page.locator("h2#comments")
-            if header.count() == 0:
-                header = page.locator("h2:has-text('Comments')")
-
-            if header.count() > 0:
-                text = (header.first.text_content() or "").strip()
-                match = re.search(r"\((\d+)\)", text)
-                if match:
-                    comment_count = int(match.group(1))
+            try:
+                html = page.content()
+            except Exception as content_e:
+                logger.debug("Failed to fetch page content for header count: %s", content_e)
+                html = ""
+
+            match = _COMMENTS_HEADER_RE.search(html) or _COMMENTS_H2_RE.search(html)
+            if match:
+                comment_count = int(match.group(1))
 
         return comment_count
 
@@ -508,8 +823,8 @@ class BrowserScraper:
                 parent_selector = "h2.title a, div.node h2 a, ul.breadcrumb a, a[href^='/node/'], a[href*='/node/']"
                 try:
                     page.wait_for_selector(parent_selector, timeout=3000)
-                except Exception:
-                    pass
+                except PlaywrightTimeoutError:
+                    pass  # Parent link may simply not exist; fall through
                 parent_link = page.locator(parent_selector).first
                 if parent_link.count() > 0:
                     parent_url = parent_link.get_attribute("href") or ""
@@ -583,23 +898,19 @@ class BrowserScraper:
 
             if target_comment_id:
                 result.linked_comment_id = target_comment_id
-                # Selector for comment text: div#comment-id .content
-                comment_el = page.locator(f"#{target_comment_id} .content")
-                if comment_el.count() > 0:
-                    result.linked_comment = (comment_el.text_content() or "").strip()
+
+            # One round-trip for every field instead of a locator call each
+            data = page.evaluate(self._DEAL_DATA_SCRIPT, target_comment_id)
+
+            if data.get("linkedComment"):
+                result.linked_comment = data["linkedComment"]
 
             # Title
-            if page.locator("h1#title").count() > 0:
-                result.title = (page.locator("h1#title").text_content() or "").strip()
-            elif page.locator("h1").count() > 0:
-                result.title = (page.locator("h1").first.text_content() or "").strip()
-
-            # Expired Status
-            result.is_expired = False
-            # Check for "expired" span within the main node container
-            node_el = page.locator("div.node").first
-            if node_el.count() > 0 and node_el.locator("span:has-text('expired')").count() > 0:
-                result.is_expired = True
+            if data.get("title"):
+                result.title = data["title"]
+
+            # Expired Status ("expired" span within the main node container)
+            result.is_expired = bool(data.get("isExpired"))
 
             # Post-Extraction Cleanup: Title Noise
             if not result.title or result.title in BOT_WALL_TITLES:
@@ -607,48 +918,30 @@ class BrowserScraper:
                     "Bot-wall or empty title detected", extra={"event_type": "security_challenge", "challenge_type": "cloudflare"}
                 )
                 # Attempt to extract from h2 if h1 was generic
-                h2_el = page.locator("h2").first
-                if h2_el.count() > 0:
-                    result.title = (h2_el.text_content() or "").strip()
+                if data.get("h2Fallback"):
+                    result.title = data["h2Fallback"]
 
                 # If still empty or in BOT_WALL_TITLES, mark as error
                 if not result.title or result.title in BOT_WALL_TITLES:
                     result.error = "Bot-wall block or empty page detected"
 
             # --- Posted Date & Domain ---
-            submitted_loc = page.locator("div.submitted")
-            if submitted_loc.count() > 0:
-                # Use the first one (primary deal submission)
-                primary_submitted = submitted_loc.first
-
-                # 1. External Domain
-                domain_link = primary_submitted.locator("a[href^='/goto/']")
-                if domain_link.count() > 0:
-                    result.external_domain = (domain_link.first.text_content() or "").strip()
-
-                # 2. Posted Date
-                submitted_text = (primary_submitted.text_content() or "").strip()
+            if data.get("externalDomain"):
+                result.external_domain = data["externalDomain"]
+            if data.get("submittedText"):
                 # Pattern: "on 13/12/2025 - 09:30"
-                match = re.search(r"on (\d{2}/\d{2}/\d{4} - \d{2}:\d{2})", submitted_text)
+                match = _POSTED_RE.search(data["submittedText"])
                 if match:
                     result.posted_date = match.group(1)
 
-            # Coupon Code
-            if page.locator("div.couponcode").count() > 0:
-                # Check for strong tags (usually the actual code)
-                strong_codes = page.locator("div.couponcode strong").all()
-                if strong_codes:
-                    codes = [(el.text_content() or "").strip() for el in strong_codes]
-                    result.coupon_code = ", ".join(codes)
-                else:
-                    result.coupon_code = (page.locator("div.couponcode").text_content() or "").strip()
+            # Coupon Code (strong tags usually hold the actual code)
+            if data.get("couponStrongs"):
+                result.coupon_code = ", ".join(data["couponStrongs"])
+            elif data.get("couponText"):
+                result.coupon_code = data["couponText"]
 
             # Content / Description
-            description_text = ""
-            if page.locator("div.node-content").count() > 0:
-                description_text = (page.locator("div.node-content").text_content() or "").strip()
-            elif page.locator("div.content").count() > 0:
-                description_text = (page.locator("div.content").first.text_content() or "").strip()
+            description_text = data.get("description") or ""
 
             # Clean description
             if result.coupon_code:
@@ -660,31 +953,22 @@ class BrowserScraper:
 
             result.description = description_text
 
-            # Tags
-            tags = []
-            # Updated to include categories, tags, and brands
-            tag_links = page.locator(
-                "div.taxonomy a[href^='/cat/'], div.taxonomy a[href^='/tag/'], div.taxonomy a[href^='/brand/']"
-            ).all()
-            for link in tag_links:
-                tag_text = (link.text_content() or "").strip()
-                if tag_text and tag_text not in tags:
-                    tags.append(tag_text)
-            result.tags = tags
+            # Tags (categories, tags, and brands; order-preserving dedupe)
+            result.tags = list(dict.fromkeys(tag for tag in (data.get("tags") or []) if tag))
 
             # Upvotes
-            if page.locator("div.n-vote span.voteup span").count() > 0:
+            if data.get("upvotes") is not None:
                 try:
-                    result.upvotes = int((page.locator("div.n-vote span.voteup span").first.text_content() or "0").strip())
-                except Exception as vote_e:
+                    result.upvotes = int(data["upvotes"])
+                except ValueError as vote_e:
                     logger.warning("Failed to parse upvotes: %s", vote_e)
                     result.upvotes = 0
 
             # Downvotes
-            if page.locator("div.n-vote span.votedown span").count() > 0:
+            if data.get("downvotes") is not None:
                 try:
-                    result.downvotes = int((page.locator("div.n-vote span.votedown span").first.text_content() or "0").strip())
-                except Exception as vote_e:
+                    result.downvotes = int(data["downvotes"])
+                except ValueError as vote_e:
                     logger.warning("Failed to parse downvotes: %s", vote_e)
                     result.downvotes = 0
 
@@ -693,7 +977,7 @@ class BrowserScraper:
 
             # Price
             if result.title:
-                price_match = re.search(r"\$\d+(?:,\d+)*(?:\.\d+)?", result.title)
+                price_match = _PRICE_RE.search(result.title)
                 if price_match:
                     result.price = price_match.group(0)
 
@@ -705,7 +989,10 @@ class BrowserScraper:
     def scrape_deal_page(self, url: str, browser=None, timeout: int = 30000) -> DealResult:
         """
         Scrapes details from a specific deal or comment page.
-        Supports connecting via CDP if self.cdp_url is set.
+        Without an explicit browser, this thread's persistent instance is
+        (lazily created and) reused, so batch callers pay one browser start
+        per thread instead of one per URL. Call close() — or use the scraper
+        as a context manager — to release it.
         """
         if browser:
             # Reuse active context (which shares cookies/session state) if available
@@ -720,34 +1007,20 @@ class BrowserScraper:
             finally:
                 page.close()
 
-        with sync_playwright() as p:
-            if self.cdp_url:
-                logger.info("Connecting to Chrome via CDP: %s", self.cdp_url)
-                try:
-                    browser = p.chromium.connect_over_cdp(self.cdp_url)
-                    try:
-                        page = browser.new_page()
-                        try:
-                            self.setup_page_routing(page)
-                            page.goto(url, timeout=timeout, wait_until="domcontentloaded")
-                            result = self._extract_deal_data(page, url)
-                            return result
-                        finally:
-                            page.close()
-                    finally:
-                        browser.close()
-                except Exception as e:
-                    return DealResult(error=f"CDP Connection failed: {str(e)}", url=url)
-            else:
-                try:
-                    browser = p.chromium.launch(headless=self.headless)
-                    try:
-                        page = browser.new_page()
-                        self.setup_page_routing(page)
-                        page.goto(url, timeout=timeout, wait_until="domcontentloaded")
-                        result = self._extract_deal_data(page, url)
-                        return result
-                    finally:
-                        browser.close()
-                except Exception as e:
-                    return DealResult(error=str(e), url=url)
+        try:
+            _, context = self._ensure_browser()
+        except Exception as e:
+            return DealResult(error=f"Browser launch failed: {e}", url=url)
+
+        page = context.new_page()
+        self.setup_page_routing(page)
+        try:
+            page.goto(url, timeout=timeout, wait_until="domcontentloaded")
+            return self._extract_deal_data(page, url)
+        except Exception as e:
+            return DealResult(error=str(e), url=url)
+        finally:
+            try:
+                page.close()
+            except Exception as close_e:
+                logger.debug("Error closing page: %s", close_e)
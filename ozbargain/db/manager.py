@@ -1,8 +1,10 @@
 import sqlite3
 import json
+import threading
+from collections import OrderedDict
 from contextlib import contextmanager
-from datetime import datetime, timezone
-from typing import Dict, Iterator, List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Set
 from ..utils.logger import setup_logger
 from ..config import settings
 from ..models import DealResult
@@ -10,24 +12,238 @@ from .schema import run_migrations
 
 logger = setup_logger("db_manager")
 
+# Bot-wall indicator titles (kept in sync with core.scraper.BOT_WALL_TITLES;
+# the db layer deliberately does not import from core)
+_BOT_WALL_TITLES = frozenset({"OzBargain", "www.ozbargain.com.au", "Performing security verification"})
+
+# Hot-path SQL hoisted to module level. sqlite3 caches compiled statements
+# per-connection keyed on the exact SQL text, so reusing these constants
+# guarantees cache hits instead of re-parsing the statement on every call.
+_BOT_WALL_TITLES_SQL = ", ".join(f"'{title}'" for title in sorted(_BOT_WALL_TITLES))
+
+# Single-statement upsert: the DO UPDATE clause carries the full merge logic
+# ("Data Integrity Guard" plus metadata preservation) that previously needed a
+# SELECT followed by INSERT OR REPLACE. Empty/placeholder incoming values fall
+# back to the stored row; an UPDATE also avoids REPLACE's delete+reinsert and
+# the index churn that comes with it. RETURNING hands back the merged counters
+# for the history snapshot without another round-trip.
+_SQL_UPSERT_DEAL = f"""
+    INSERT INTO live_deals (
+        resolved_id, resolved_url, original_url,
+        title, price, description, coupon_code, tags,
+        upvotes, downvotes, comment_count,
+        timestamp, time_str, user, action, type, is_expired,
+        posted_date, external_domain, source
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(resolved_id) DO UPDATE SET
+        resolved_url = COALESCE(NULLIF(excluded.resolved_url, ''), live_deals.resolved_url),
+        original_url = COALESCE(NULLIF(excluded.original_url, ''), live_deals.original_url),
+        title = CASE
+            WHEN excluded.title IS NOT NULL AND excluded.title != ''
+                 AND excluded.title NOT IN ({_BOT_WALL_TITLES_SQL})
+            THEN excluded.title ELSE live_deals.title
+        END,
+        price = COALESCE(NULLIF(excluded.price, ''), live_deals.price),
+        description = COALESCE(NULLIF(excluded.description, ''), live_deals.description),
+        coupon_code = COALESCE(NULLIF(excluded.coupon_code, ''), live_deals.coupon_code),
+        tags = CASE
+            WHEN excluded.tags IS NOT NULL AND excluded.tags NOT IN ('', '[]')
+            THEN excluded.tags ELSE COALESCE(NULLIF(live_deals.tags, ''), '[]')
+        END,
+        upvotes = CASE
+            WHEN excluded.upvotes = 0 AND live_deals.upvotes > 0
+            THEN live_deals.upvotes ELSE excluded.upvotes
+        END,
+        downvotes = COALESCE(excluded.downvotes, live_deals.downvotes),
+        comment_count = CASE
+            WHEN excluded.comment_count = 0 AND live_deals.comment_count > 0
+            THEN live_deals.comment_count ELSE excluded.comment_count
+        END,
+        timestamp = excluded.timestamp,
+        time_str = COALESCE(NULLIF(excluded.time_str, ''), live_deals.time_str),
+        user = CASE
+            WHEN excluded.user IS NOT NULL AND excluded.user NOT IN ('', 'Unknown')
+            THEN excluded.user ELSE live_deals.user
+        END,
+        action = COALESCE(NULLIF(excluded.action, ''), live_deals.action),
+        type = COALESCE(NULLIF(excluded.type, ''), live_deals.type),
+        is_expired = COALESCE(excluded.is_expired, live_deals.is_expired),
+        posted_date = COALESCE(NULLIF(excluded.posted_date, ''), live_deals.posted_date),
+        external_domain = COALESCE(NULLIF(excluded.external_domain, ''), live_deals.external_domain),
+        source = COALESCE(NULLIF(excluded.source, ''), live_deals.source)
+    RETURNING upvotes, comment_count
+"""
+
+_SQL_INSERT_SNAPSHOT = """
+    INSERT INTO deal_snapshots (deal_id, timestamp, upvotes, comment_count)
+    VALUES (?, ?, ?, ?)
+"""
+
+_SQL_DELETE_DEAL_TAGS = "DELETE FROM deal_tags WHERE deal_id = ?"
+
+_SQL_INSERT_DEAL_TAG = "INSERT OR IGNORE INTO deal_tags (deal_id, tag) VALUES (?, ?)"
+
+_SQL_HAS_ALERTED = "SELECT 1 FROM alert_history WHERE deal_id = ? AND alert_type = ?"
+
+_SQL_LOG_ALERT = "INSERT OR IGNORE INTO alert_history (deal_id, alert_type, timestamp) VALUES (?, ?, ?)"
+
+_SQL_LOG_USER_ACTIVITY = """
+    INSERT OR REPLACE INTO user_activity (user_id, deal_id, activity_ref, content, activity_type, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
+def _build_trending_sql(exclude_alert: bool, with_limit: bool) -> str:
+    query = """
+        SELECT d.*, ((d.upvotes * 2) + d.comment_count) as heat_score
+        FROM live_deals d
+    """
+    if exclude_alert:
+        query += " LEFT JOIN alert_history a ON a.deal_id = d.resolved_id AND a.alert_type = ?"
+    query += """
+        WHERE d.timestamp > datetime('now', ?)
+        AND ((d.upvotes * 2) + d.comment_count) >= ?
+        AND d.is_expired = 0
+        AND d.source = 'live'
+    """
+    if exclude_alert:
+        query += " AND a.deal_id IS NULL"
+    query += " ORDER BY heat_score DESC"
+    if with_limit:
+        query += " LIMIT ?"
+    return query
+
+
+# All four trending query variants, built once at import so every call reuses
+# byte-identical SQL text (a statement-cache hit) instead of re-concatenating.
+_SQL_TRENDING = {
+    (exclude_alert, with_limit): _build_trending_sql(exclude_alert, with_limit)
+    for exclude_alert in (False, True)
+    for with_limit in (False, True)
+}
+
 
 class StorageManager:
+    # Seconds a cached watched-tags read stays fresh before re-querying
+    WATCHED_TAGS_TTL = 60
+
+    # Snapshot buffering: flush when this many are pending or the oldest is this stale
+    SNAPSHOT_FLUSH_SIZE = 50
+    SNAPSHOT_FLUSH_SECONDS = 60
+
+    # Per-deal counters remembered for snapshot dedupe (LRU-evicted)
+    SNAPSHOT_DEDUPE_MAX = 4096
+
     def __init__(self, db_path: Optional[str] = None):
         if db_path is None:
             # Flexible for Docker / Env config
             db_path = settings.ozbargain_db_path
 
         self.db_path = db_path
+        self._watched_tags_cache: Optional[List[str]] = None
+        self._watched_tags_expiry = datetime.min.replace(tzinfo=timezone.utc)
+        # History snapshots are analytics-only, so they are buffered and
+        # written in periodic executemany batches rather than one insert per
+        # upsert. Buffer access always happens under the connection lock.
+        self._snapshot_buffer: List[tuple] = []
+        self._snapshot_last_flush = datetime.now(timezone.utc)
+        # Last (upvotes, comment_count) snapshotted per deal: re-scrapes that
+        # change nothing are skipped entirely, since an identical snapshot adds
+        # no information to the velocity window.
+        self._last_snapshot_counts: "OrderedDict[str, tuple]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_lock = threading.RLock()
         self._initialize_db()
 
     @contextmanager
     def _get_connection(self) -> Iterator[sqlite3.Connection]:
-        """Context manager for database connections. Guarantees cleanup on exception."""
-        conn = sqlite3.connect(self.db_path)
+        """Yields the shared persistent connection under a re-entrant lock.
+
+        One connection per StorageManager: opening/closing SQLite per call
+        threw away the page cache and the prepared-statement cache on every
+        query. The lock serializes access from the poll thread, the Telegram
+        listener and scrape workers; an exception inside the block rolls back
+        any open transaction so the shared connection stays usable.
+        """
+        with self._conn_lock:
+            if self._conn is None:
+                self._conn = sqlite3.connect(self.db_path, cached_statements=256, check_same_thread=False)
+                self._apply_pragmas(self._conn)
+            try:
+                yield self._conn
+            except Exception:
+                self._conn.rollback()
+                raise
+
+    def close(self) -> None:
+        """Flushes pending snapshots and closes the shared connection."""
+        with self._conn_lock:
+            if self._conn is not None:
+                self.flush_snapshots()
+                self._conn.close()
+                self._conn = None
+
+    def _queue_snapshot(self, cursor: sqlite3.Cursor, snapshot: tuple) -> None:
+        """Buffers a history snapshot, flushing on the caller's cursor when due.
+
+        Must be called with the connection lock held (i.e. from inside a
+        _get_connection block); the flush rides on the caller's transaction.
+        """
+        self._snapshot_buffer.append(snapshot)
+        now = datetime.now(timezone.utc)
+        if (
+            len(self._snapshot_buffer) >= self.SNAPSHOT_FLUSH_SIZE
+            or (now - self._snapshot_last_flush).total_seconds() >= self.SNAPSHOT_FLUSH_SECONDS
+        ):
+            cursor.executemany(_SQL_INSERT_SNAPSHOT, self._snapshot_buffer)
+            self._snapshot_buffer.clear()
+            self._snapshot_last_flush = now
+
+    def _snapshot_changed(self, resolved_id: str, upvotes: int, comment_count: int) -> bool:
+        """Records the latest counters for a deal; False if they are unchanged.
+
+        Must be called with the connection lock held. The memory of past
+        counters is LRU-capped, so a long-dormant deal may produce one
+        redundant snapshot when it resurfaces — harmless for velocity math.
+        """
+        counts = (upvotes, comment_count)
+        if self._last_snapshot_counts.get(resolved_id) == counts:
+            self._last_snapshot_counts.move_to_end(resolved_id)
+            return False
+        self._last_snapshot_counts[resolved_id] = counts
+        self._last_snapshot_counts.move_to_end(resolved_id)
+        if len(self._last_snapshot_counts) > self.SNAPSHOT_DEDUPE_MAX:
+            self._last_snapshot_counts.popitem(last=False)
+        return True
+
+    def flush_snapshots(self) -> None:
+        """Writes any buffered snapshots immediately."""
+        with self._get_connection() as conn:
+            if not self._snapshot_buffer:
+                return
+            conn.cursor().executemany(_SQL_INSERT_SNAPSHOT, self._snapshot_buffer)
+            self._snapshot_buffer.clear()
+            self._snapshot_last_flush = datetime.now(timezone.utc)
+            conn.commit()
+
+    @staticmethod
+    def _apply_pragmas(conn: sqlite3.Connection) -> None:
+        """Applies performance pragmas to a fresh connection.
+
+        WAL lets the monitor's readers (trending sweep, tag lookups) proceed
+        while writers commit, and mmap serves page reads straight from the OS
+        page cache. synchronous=NORMAL skips the per-commit fsync that FULL
+        pays; with WAL this only risks losing the last commits on power loss,
+        never corruption, which is a fine trade for re-scrapeable feed data.
+        All best-effort: older SQLite builds ignore them.
+        """
         try:
-            yield conn
-        finally:
-            conn.close()
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA mmap_size=134217728")  # 128 MiB
+            conn.execute("PRAGMA busy_timeout=5000")
+        except sqlite3.Error as e:
+            logger.debug("Failed to apply connection pragmas: %s", e)
 
     def _initialize_db(self):
         """Creates the database schema and runs migrations."""
@@ -41,144 +257,112 @@ class StorageManager:
         """Inserts or updates a deal record, and logs a history snapshot."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
+            resolved_id, snapshot = self._upsert_deal(cursor, deal, source)
+            if snapshot:
+                self._queue_snapshot(cursor, snapshot)
+            conn.commit()
 
-            # Determine PK
-            resolved_id = deal.id or deal.url
-            resolved_url = deal.url
-
-            # Serialize tags to JSON array
-            tags_str = json.dumps(deal.tags) if isinstance(deal.tags, list) else json.dumps([])
-
-            now_ts = datetime.now(timezone.utc)
+        logger.info(
+            "Successful deal upsert for %s", resolved_id, extra={"event_type": "storage_upsert", "items_count": 1}
+        )
+        return resolved_id
 
-            # 1. Fetch current state to check for "Data Integrity Guard" and metadata preservation
-            cursor.execute(
-                """
-                SELECT resolved_url, original_url, title, price, description, coupon_code, tags,
-                       upvotes, downvotes, comment_count, time_str, user, action, type, is_expired,
-                       posted_date, external_domain, source
-                FROM live_deals WHERE resolved_id = ?
-                """,
-                (resolved_id,)
-            )
-            existing = cursor.fetchone()
-
-            upvotes = deal.upvotes
-            comment_count = deal.comment_count
-
-            # Bot-wall indicator titles
-            bot_wall_titles = {"OzBargain", "www.ozbargain.com.au", "Performing security verification"}
-
-            if existing:
-                (
-                    orig_url, orig_orig_url, orig_title, orig_price, orig_desc, orig_coupon, orig_tags,
-                    orig_upvotes, orig_downvotes, orig_comments, orig_time_str, orig_user, orig_action, orig_type,
-                    orig_is_expired, orig_posted_date, orig_ext_domain, orig_source
-                ) = existing
-
-                # Merge logic: preserve existing values if incoming scraped data is empty/null/zero
-                title = deal.title if (deal.title and deal.title not in bot_wall_titles) else orig_title
-                price = deal.price if deal.price else orig_price
-                description = deal.description if deal.description else orig_desc
-                coupon_code = deal.coupon_code if deal.coupon_code else orig_coupon
-
-                if deal.tags and len(deal.tags) > 0:
-                    tags_str = json.dumps(deal.tags)
-                else:
-                    tags_str = orig_tags if orig_tags else json.dumps([])
-
-                if upvotes == 0 and orig_upvotes and orig_upvotes > 0:
-                    logger.info("Preserving upvotes (%d) for %s (Incoming was 0)", orig_upvotes, resolved_id)
-                    upvotes = orig_upvotes
-
-                downvotes = deal.downvotes if deal.downvotes is not None else orig_downvotes
-
-                if comment_count == 0 and orig_comments and orig_comments > 0:
-                    logger.info("Preserving comment_count (%d) for %s (Incoming was 0)", orig_comments, resolved_id)
-                    comment_count = orig_comments
-
-                time_str = deal.time_str if deal.time_str else orig_time_str
-                user = deal.user if (deal.user and deal.user != "Unknown") else orig_user
-                action = deal.action if deal.action else orig_action
-                type_ = deal.type if deal.type else orig_type
-                is_expired = (1 if deal.is_expired else 0) if deal.is_expired is not None else orig_is_expired
-                posted_date = deal.posted_date if deal.posted_date else orig_posted_date
-                external_domain = deal.external_domain if deal.external_domain else orig_ext_domain
-                resolved_url = resolved_url if resolved_url else orig_url
-                original_url = (deal.original_url or deal.url) if (deal.original_url or deal.url) else orig_orig_url
-                source_val = source if source else orig_source
-            else:
-                title = deal.title
-                price = deal.price
-                description = deal.description
-                coupon_code = deal.coupon_code
-                tags_str = json.dumps(deal.tags) if isinstance(deal.tags, list) else json.dumps([])
-                downvotes = deal.downvotes
-                time_str = deal.time_str
-                user = deal.user
-                action = deal.action
-                type_ = deal.type
-                is_expired = 1 if deal.is_expired else 0
-                posted_date = deal.posted_date
-                external_domain = deal.external_domain
-                original_url = deal.original_url or deal.url
-                source_val = source
-
-            # 2. Upsert Current State
-            cursor.execute(
-                """
-                INSERT OR REPLACE INTO live_deals (
-                    resolved_id, resolved_url, original_url,
-                    title, price, description, coupon_code, tags,
-                    upvotes, downvotes, comment_count,
-                    timestamp, time_str, user, action, type, is_expired,
-                    posted_date, external_domain, source
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    resolved_id,
-                    resolved_url,
-                    original_url,
-                    title,
-                    price,
-                    description,
-                    coupon_code,
-                    tags_str,
-                    upvotes,
-                    downvotes,
-                    comment_count,
-                    now_ts,
-                    time_str,
-                    user,
-                    action,
-                    type_,
-                    is_expired,
-                    posted_date,
-                    external_domain,
-                    source_val,
-                ),
-            )
+    def upsert_live_deals(self, deals: List["DealResult"], source: str = "live") -> List[str]:
+        """Bulk variant of upsert_live_deal: one transaction for all deals.
 
-            # 3. Add History Snapshot (For Trending Velocity)
-            # We assume deal.timestamp is the event time, but for snapshots we usually want "recorded at" time
-            # Using current system time for the snapshot timestamp makes velocity calcs reliable relative to "now"
-            cursor.execute(
-                """
-                INSERT INTO deal_snapshots (deal_id, timestamp, upvotes, comment_count)
-                VALUES (?, ?, ?, ?)
-            """,
-                (resolved_id, now_ts, upvotes, comment_count),
-            )
+        Deal rows are merged individually (the integrity guard needs the
+        existing state per deal), but the history snapshots are written with a
+        single executemany and everything lands in one commit.
+        """
+        if not deals:
+            return []
 
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            resolved_ids = []
+            snapshots = []
+            for deal in deals:
+                resolved_id, snapshot = self._upsert_deal(cursor, deal, source)
+                resolved_ids.append(resolved_id)
+                if snapshot:
+                    snapshots.append(snapshot)
+            if snapshots:
+                cursor.executemany(_SQL_INSERT_SNAPSHOT, snapshots)
             conn.commit()
 
         logger.info(
-            "Successful deal upsert for %s", resolved_id, extra={"event_type": "storage_upsert", "items_count": 1}
+            "Bulk deal upsert for %d deals",
+            len(resolved_ids),
+            extra={"event_type": "storage_upsert", "items_count": len(resolved_ids)},
         )
-        return resolved_id
+        return resolved_ids
+
+    def _upsert_deal(self, cursor: sqlite3.Cursor, deal: "DealResult", source: str = "live") -> tuple:
+        """Writes a deal record on an open cursor (no commit).
+
+        Returns (resolved_id, snapshot_params); snapshot_params is None when
+        the merged counters are unchanged since the last snapshot. The caller
+        is responsible for inserting the history snapshot (single execute or
+        batched executemany) and committing, so several writes can share one
+        transaction.
+        """
+        # Determine PK
+        resolved_id = deal.id or deal.url
+
+        # Serialize tags to JSON array
+        tags_str = json.dumps(deal.tags) if isinstance(deal.tags, list) else json.dumps([])
+
+        now_ts = datetime.now(timezone.utc)
+        is_expired = None if deal.is_expired is None else (1 if deal.is_expired else 0)
+
+        # Raw incoming values go in; on conflict the DO UPDATE clause applies
+        # the merge rules in SQL, so no preliminary SELECT is needed.
+        cursor.execute(
+            _SQL_UPSERT_DEAL,
+            (
+                resolved_id,
+                deal.url,
+                deal.original_url or deal.url,
+                deal.title,
+                deal.price,
+                deal.description,
+                deal.coupon_code,
+                tags_str,
+                deal.upvotes,
+                deal.downvotes,
+                deal.comment_count,
+                now_ts,
+                deal.time_str,
+                deal.user,
+                deal.action,
+                deal.type,
+                is_expired,
+                deal.posted_date,
+                deal.external_domain,
+                source,
+            ),
+        )
+        upvotes, comment_count = cursor.fetchone()
+
+        # Mirror non-empty tag lists into the normalized deal_tags table.
+        # An empty incoming list leaves both the JSON column and the rows
+        # untouched (same preservation rule as the merge above).
+        if deal.tags:
+            cursor.execute(_SQL_DELETE_DEAL_TAGS, (resolved_id,))
+            cursor.executemany(_SQL_INSERT_DEAL_TAG, [(resolved_id, tag.lower()) for tag in deal.tags])
+
+        # History Snapshot params (For Trending Velocity) - inserted by the caller.
+        # We assume deal.timestamp is the event time, but for snapshots we usually want "recorded at" time
+        # Using current system time for the snapshot timestamp makes velocity calcs reliable relative to "now"
+        # None when the merged counters match the last snapshot: most re-scrapes
+        # change nothing, and identical rows would only bloat deal_snapshots.
+        if not self._snapshot_changed(resolved_id, upvotes, comment_count):
+            return resolved_id, None
+        return resolved_id, (resolved_id, now_ts, upvotes, comment_count)
 
     def cleanup_snapshots(self, hours_retention: int = 168):
         """Deletes snapshots older than X hours (default 7 days)."""
+        self.flush_snapshots()
         with self._get_connection() as conn:
             cursor = conn.cursor()
 
@@ -192,31 +376,28 @@ class StorageManager:
 
         logger.info("Cleaned up %d old snapshots.", deleted)
 
-    def get_trending_deals(self, hours: int = 24, limit: int = -1, min_score: int = 0) -> List[Dict]:
+    def get_trending_deals(
+        self, hours: int = 24, limit: int = -1, min_score: int = 0, exclude_alert_type: Optional[str] = None
+    ) -> List[Dict]:
         """
         Returns deals with the highest 'Heat Score' in the last X hours.
         Heat Score = (Upvotes * 2) + Comments.
         If limit <= 0, returns ALL matching deals (no limit).
+        If exclude_alert_type is given, deals that already have an alert of
+        that type are filtered out in SQL (LEFT JOIN on alert_history) so the
+        caller never needs per-deal has_alerted() checks.
         """
         with self._get_connection() as conn:
-            conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
 
-            hours_modifier = f"-{int(hours)} hours"
-
-            query = """
-                SELECT *, ((upvotes * 2) + comment_count) as heat_score
-                FROM live_deals
-                WHERE timestamp > datetime('now', ?)
-                AND ((upvotes * 2) + comment_count) >= ?
-                AND (is_expired = 0 OR is_expired IS NULL)
-                AND source = 'live'
-                ORDER BY heat_score DESC
-            """
-            params: list = [hours_modifier, int(min_score)]
+            query = _SQL_TRENDING[(bool(exclude_alert_type), limit > 0)]
 
+            params: list = []
+            if exclude_alert_type:
+                params.append(exclude_alert_type)
+            params.extend([f"-{int(hours)} hours", int(min_score)])
             if limit > 0:
-                query += " LIMIT ?"
                 params.append(int(limit))
 
             cursor.execute(query, params)
@@ -239,20 +420,35 @@ class StorageManager:
             row = cursor.fetchone()
 
             if not row:
-                # Try fuzzy match if exact fails (e.g. title has extra whitespace or suffix)
-                cursor.execute(
-                    "SELECT resolved_id FROM live_deals WHERE title LIKE ? AND resolved_id LIKE 'node/%' LIMIT 1",
-                    (f"%{title}%",),
-                )
-                row = cursor.fetchone()
+                # Fuzzy match via the FTS5 title index (e.g. title has extra
+                # whitespace or a suffix); the phrase query tolerates token
+                # drift without the full-table scan a LIKE '%...%' costs.
+                try:
+                    match_query = '"' + title.replace('"', '""') + '"'
+                    cursor.execute(
+                        """
+                        SELECT resolved_id FROM live_deals
+                        WHERE rowid IN (SELECT rowid FROM live_deals_fts WHERE live_deals_fts MATCH ?)
+                        AND resolved_id LIKE 'node/%' LIMIT 1
+                        """,
+                        (match_query,),
+                    )
+                    row = cursor.fetchone()
+                except sqlite3.OperationalError:
+                    # FTS5 missing from this build: fall back to the slow scan
+                    cursor.execute(
+                        "SELECT resolved_id FROM live_deals WHERE title LIKE ? AND resolved_id LIKE 'node/%' LIMIT 1",
+                        (f"%{title}%",),
+                    )
+                    row = cursor.fetchone()
 
             return row[0] if row else None
 
     def get_noisy_records(self) -> List[Dict]:
         """Returns records with missing/noisy titles (e.g. www.ozbargain.com.au or empty)."""
         with self._get_connection() as conn:
-            conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
             cursor.execute(
                 "SELECT resolved_id, resolved_url FROM live_deals WHERE title = 'www.ozbargain.com.au' OR title = '' OR title IS NULL"
             )
@@ -268,6 +464,7 @@ class StorageManager:
             try:
                 cursor.execute("INSERT OR IGNORE INTO watched_tags (tag, is_active) VALUES (?, 1)", (tag,))
                 conn.commit()
+                self._watched_tags_cache = None
             except Exception as e:
                 logger.error("Error adding tag %s: %s", tag, e)
 
@@ -277,14 +474,23 @@ class StorageManager:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM watched_tags WHERE tag = ?", (tag,))
             conn.commit()
+            self._watched_tags_cache = None
 
     def get_watched_tags(self) -> List[str]:
-        """Returns a list of active watched tags."""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT tag FROM watched_tags WHERE is_active = 1")
-            rows = cursor.fetchall()
-            return [row[0] for row in rows]
+        """Returns a list of active watched tags.
+
+        Cached with a short TTL; add/remove invalidate the cache immediately,
+        so Telegram commands take effect on the next read while hot-path
+        callers avoid a query per deal.
+        """
+        now = datetime.now(timezone.utc)
+        if self._watched_tags_cache is None or now > self._watched_tags_expiry:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT tag FROM watched_tags WHERE is_active = 1")
+                self._watched_tags_cache = [row[0] for row in cursor.fetchall()]
+                self._watched_tags_expiry = now + timedelta(seconds=self.WATCHED_TAGS_TTL)
+        return self._watched_tags_cache
 
     # --- Alert History Methods ---
 
@@ -292,24 +498,96 @@ class StorageManager:
         """Checks if an alert of this type has already been sent for the deal."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT 1 FROM alert_history WHERE deal_id = ? AND alert_type = ?", (deal_id, alert_type))
+            cursor.execute(_SQL_HAS_ALERTED, (deal_id, alert_type))
             return cursor.fetchone() is not None
 
+    def try_log_alert(self, deal_id: str, alert_type: str) -> bool:
+        """Atomically claims the alert slot for a deal.
+
+        Single INSERT OR IGNORE + rowcount check instead of a separate
+        has_alerted() read followed by log_alert(): two concurrent scrape
+        workers can no longer both pass the read and double-send. Returns
+        True if this caller won the claim.
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_SQL_LOG_ALERT, (deal_id, alert_type, datetime.now(timezone.utc)))
+            conn.commit()
+            return cursor.rowcount > 0
+
+    def remove_alert(self, deal_id: str, alert_type: str):
+        """Releases a claimed alert slot (used when the send fails after a claim)."""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM alert_history WHERE deal_id = ? AND alert_type = ?", (deal_id, alert_type))
+            conn.commit()
+
     def log_alert(self, deal_id: str, alert_type: str):
         """Logs that an alert has been sent."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
             try:
-                cursor.execute(
-                    "INSERT OR IGNORE INTO alert_history (deal_id, alert_type, timestamp) VALUES (?, ?, ?)",
-                    (deal_id, alert_type, datetime.now(timezone.utc)),
-                )
+                cursor.execute(_SQL_LOG_ALERT, (deal_id, alert_type, datetime.now(timezone.utc)))
                 conn.commit()
             except Exception as e:
                 logger.error("Error logging alert for %s: %s", deal_id, e)
 
+    def log_alerts(self, deal_ids: List[str], alert_type: str):
+        """Logs alerts for multiple deals in one transaction (batched log_alert)."""
+        if not deal_ids:
+            return
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                now_ts = datetime.now(timezone.utc)
+                cursor.executemany(_SQL_LOG_ALERT, [(deal_id, alert_type, now_ts) for deal_id in deal_ids])
+                conn.commit()
+            except Exception as e:
+                logger.error("Error logging %d alerts: %s", len(deal_ids), e)
+
     # --- User Archive Methods ---
 
+    def archive_user_activity(
+        self,
+        deal: "DealResult",
+        user_id: str,
+        activity_ref: str,
+        content: str,
+        activity_type: str = "comment",
+        source: str = "manual_fetch",
+    ) -> str:
+        """Upserts a deal and logs the associated user activity in ONE transaction.
+
+        Used by the activity fetcher so each item costs a single commit instead
+        of two (deal upsert + activity insert).
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            resolved_id, snapshot = self._upsert_deal(cursor, deal, source)
+            if snapshot:
+                self._queue_snapshot(cursor, snapshot)
+            cursor.execute(
+                _SQL_LOG_USER_ACTIVITY,
+                (user_id, resolved_id, activity_ref, content, activity_type, datetime.now(timezone.utc)),
+            )
+            conn.commit()
+
+        logger.info(
+            "Archived activity %s for %s", activity_ref, user_id, extra={"event_type": "storage_upsert", "items_count": 1}
+        )
+        return resolved_id
+
+    def get_archived_activity_refs(self, user_id: str) -> Set[str]:
+        """Returns every activity_ref already archived for a user.
+
+        Lets the activity fetcher resume an interrupted run by skipping items
+        it has archived before, instead of re-scraping the whole feed.
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT activity_ref FROM user_activity WHERE user_id = ?", (user_id,))
+            return {row[0] for row in cursor.fetchall()}
+
     def log_user_activity(
         self, user_id: str, deal_id: str, activity_ref: str, content: str, activity_type: str = "comment"
     ):
@@ -318,10 +596,7 @@ class StorageManager:
             cursor = conn.cursor()
             try:
                 cursor.execute(
-                    """
-                    INSERT OR REPLACE INTO user_activity (user_id, deal_id, activity_ref, content, activity_type, timestamp)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """,
+                    _SQL_LOG_USER_ACTIVITY,
                     (user_id, deal_id, activity_ref, content, activity_type, datetime.now(timezone.utc)),
                 )
                 conn.commit()
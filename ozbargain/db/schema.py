@@ -41,6 +41,14 @@ def run_migrations(conn: sqlite3.Connection):
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_live_deals_timestamp_source ON live_deals(timestamp, source, is_expired)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_live_deals_title ON live_deals(title)")
 
+    # Composite index matching the trending query shape: equality columns
+    # (source, is_expired) first so the timestamp range scan runs inside a
+    # narrow slice, unlike idx_live_deals_timestamp_source which leads with
+    # the range column.
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_live_deals_source_expired_time ON live_deals(source, is_expired, timestamp)"
+    )
+
 
     # Migration: Add is_expired if missing (for existing users)
     try:
@@ -48,6 +56,12 @@ def run_migrations(conn: sqlite3.Connection):
     except sqlite3.OperationalError:
         pass  # Column already exists
 
+    # Backfill NULL is_expired so queries can filter on is_expired = 0 alone
+    # instead of the three-valued (= 0 OR IS NULL) predicate. SQLite cannot
+    # retrofit NOT NULL onto an existing column without a table rebuild, so
+    # the invariant is maintained here plus by writers always binding 0/1.
+    cursor.execute("UPDATE live_deals SET is_expired = 0 WHERE is_expired IS NULL")
+
     # Migration: Add posted_date and external_domain
     try:
         cursor.execute("ALTER TABLE live_deals ADD COLUMN posted_date TEXT")
@@ -66,6 +80,39 @@ def run_migrations(conn: sqlite3.Connection):
     except sqlite3.OperationalError:
         pass
 
+    # Full-text index over deal titles for fuzzy node-ID resolution. External
+    # content table keyed on live_deals.rowid; the triggers keep it in sync.
+    # FTS5 is compiled into virtually every SQLite build, but degrade politely
+    # if it is missing — resolve_node_id_by_title falls back to LIKE.
+    try:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'live_deals_fts'")
+        fts_existed = cursor.fetchone() is not None
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS live_deals_fts
+            USING fts5(title, content='live_deals', content_rowid='rowid')
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS live_deals_fts_ai AFTER INSERT ON live_deals BEGIN
+                INSERT INTO live_deals_fts(rowid, title) VALUES (new.rowid, new.title);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS live_deals_fts_ad AFTER DELETE ON live_deals BEGIN
+                INSERT INTO live_deals_fts(live_deals_fts, rowid, title) VALUES ('delete', old.rowid, old.title);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS live_deals_fts_au AFTER UPDATE OF title ON live_deals BEGIN
+                INSERT INTO live_deals_fts(live_deals_fts, rowid, title) VALUES ('delete', old.rowid, old.title);
+                INSERT INTO live_deals_fts(rowid, title) VALUES (new.rowid, new.title);
+            END
+        """)
+        if not fts_existed:
+            # One-time backfill for databases that predate the FTS index
+            cursor.execute("INSERT INTO live_deals_fts(live_deals_fts) VALUES ('rebuild')")
+    except sqlite3.OperationalError as e:
+        logger.warning("FTS5 unavailable, title resolution will use LIKE fallback: %s", e)
+
     # User Activity Archive
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS user_activity (
@@ -92,6 +139,19 @@ def run_migrations(conn: sqlite3.Connection):
     # Index for fast trending queries
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_deal_time ON deal_snapshots(deal_id, timestamp)")
 
+    # Normalized tag rows alongside the JSON tags column on live_deals, so
+    # tag-based filtering can run as an indexed SQL lookup instead of decoding
+    # JSON per deal in Python. Tags are stored lowercased to match the
+    # case-insensitive comparison the watched-tag logic uses.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS deal_tags (
+            deal_id TEXT,
+            tag TEXT,
+            PRIMARY KEY (deal_id, tag)
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_deal_tags_tag ON deal_tags(tag)")
+
     # Config Table for User Interests (Watched Tags)
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS watched_tags (
@@ -117,4 +177,10 @@ def run_migrations(conn: sqlite3.Connection):
         )
     """)
 
+    # Supports alert-type-first lookups (batched alerted-id checks and the
+    # trending LEFT JOIN); the PK only helps when deal_id leads.
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_alert_history_type_deal ON alert_history(alert_type, deal_id)"
+    )
+
     conn.commit()
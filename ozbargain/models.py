@@ -5,13 +5,15 @@ from datetime import datetime
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class DealResult:
     """Canonical deal data returned by all scrapers.
 
     This is the shared contract between FastScraper, BrowserScraper,
     StorageManager, and LiveMonitor. Both scrapers must produce this type;
     downstream consumers can rely on its shape at the type level.
+    Slotted: no per-instance __dict__, which matters when bulk recovery
+    holds thousands of these in memory at once.
     """
 
     id: str = ""
@@ -14,6 +14,9 @@ class TelegramNotifier:
         self.bot_token = settings.telegram_bot_token
         self.chat_id = settings.telegram_chat_id
         self.enabled = bool(self.bot_token and self.chat_id)
+        # Persistent session: keeps the TLS connection to api.telegram.org alive
+        # across sends instead of a full handshake per message.
+        self.session = requests.Session()
 
         if not self.enabled:
             logger.info("Telegram Token/Chat ID not found. Running in MOCK mode (printing to console).")
@@ -38,7 +41,7 @@ class TelegramNotifier:
         payload = {"chat_id": self.chat_id, "text": text, "parse_mode": "HTML", "disable_notification": not priority}
 
         try:
-            response = requests.post(api_url, json=payload, timeout=10)
+            response = self.session.post(api_url, json=payload, timeout=10)
             response.raise_for_status()
             return True
         except Exception as e:
@@ -53,6 +56,7 @@ class TelegramListener:
         self.bot_token = notifier.bot_token
         self.chat_id = notifier.chat_id
         self.enabled = notifier.enabled
+        self.session = notifier.session
         self._shutdown = False
         self._thread = None
 
@@ -79,7 +83,7 @@ class TelegramListener:
                     "timeout": 20,
                     "allowed_updates": ["message"]
                 }
-                response = requests.post(api_url, json=payload, timeout=25)
+                response = self.session.post(api_url, json=payload, timeout=25)
                 if response.status_code != 200:
                     logger.error("Telegram getUpdates returned status code %d", response.status_code)
                     time.sleep(5)
@@ -1,11 +1,18 @@
+import atexit
 import logging
 import os
+import queue
 import sys
 import uuid
+from logging.handlers import QueueHandler, QueueListener
 from pythonjsonlogger import jsonlogger
 
 SESSION_ID = str(uuid.uuid4())[:8]
 
+# Keep listener references alive for the life of the process; each runs a
+# daemon thread draining its logger's queue.
+_listeners: list[QueueListener] = []
+
 
 class SessionContextFilter(logging.Filter):
     def filter(self, record):
@@ -32,7 +39,6 @@ def setup_logger(name: str = "ozbargain"):
     stdout_handler.setLevel(logging.INFO)
     stdout_formatter = logging.Formatter("[%(levelname)s] [%(name)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
     stdout_handler.setFormatter(stdout_formatter)
-    logger.addHandler(stdout_handler)
 
     # 2. File Handler (JSON)
     log_dir = "logs"
@@ -46,23 +52,41 @@ def setup_logger(name: str = "ozbargain"):
     # JSON Formatter
     json_formatter = jsonlogger.JsonFormatter("%(timestamp)s %(levelname)s %(name)s %(message)s", timestamp=True)
     file_handler.setFormatter(json_formatter)
-    logger.addHandler(file_handler)
+
+    handlers: list[logging.Handler] = [stdout_handler, file_handler]
 
     # 3. Logtail Handler (Optional)
     from ..config import settings
 
     logtail_token = settings.logtail_token
+    logtail_error = None
     if logtail_token:
         try:
             from logtail import LogtailHandler
 
             logtail_handler = LogtailHandler(source_token=logtail_token)
             logtail_handler.setLevel(logging.INFO)
-            logger.addHandler(logtail_handler)
-            logger.info("Logtail handler initialized.")
+            handlers.append(logtail_handler)
         except ImportError:
-            logger.warning("logtail-python not installed, skipping LogtailHandler.")
+            logtail_error = "logtail-python not installed, skipping LogtailHandler."
         except Exception as e:
-            logger.error(f"Failed to initialize LogtailHandler: {e}")
+            logtail_error = f"Failed to initialize LogtailHandler: {e}"
+
+    # Callers only pay for an in-memory queue put; formatting and the actual
+    # stream/file/network writes happen on the listener's daemon thread, off
+    # the poll/scrape hot paths.
+    log_queue: queue.Queue[logging.LogRecord] = queue.Queue(-1)
+    logger.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+    # The listener thread is a daemon; flush whatever is still queued
+    # (shutdown/error records especially) before the interpreter exits.
+    atexit.register(listener.stop)
+
+    if logtail_token and logtail_error:
+        logger.warning(logtail_error)
+    elif logtail_token:
+        logger.info("Logtail handler initialized.")
 
     return logger
@@ -11,17 +11,14 @@ def normalize_deal_url(url: str) -> str:
 
     if "/node/" in url or "/comment/" in url:
         if url.endswith("/redir"):
-            url = url.replace("/redir", "")
+            url = url.removesuffix("/redir")
         elif "/redir?" in url:
             url = url.replace("/redir?", "?")
 
     # Strip Cloudflare challenge query parameters if present
-    if "?" in url:
-        base, query = url.split("?", 1)
+    base, sep, query = url.partition("?")
+    if sep:
         params = [p for p in query.split("&") if not p.startswith("__cf_") and not p.startswith("cf_")]
-        if params:
-            url = f"{base}?{'&'.join(params)}"
-        else:
-            url = base
+        url = f"{base}?{'&'.join(params)}" if params else base
 
     return url
@@ -1,12 +1,22 @@
-from ozbargain.core.scraper import BrowserScraper
+import concurrent.futures
+
+from ozbargain.core.scraper import BrowserScraper, FastScraper
 from ozbargain.db.manager import StorageManager
 from ozbargain.utils.urls import normalize_deal_url
 from ozbargain.core.scraper import BOT_WALL_TITLES
 
 
-def recover_data():
+def _fast_scrape(record, scraper):
+    """Worker: re-scrape one noisy record over HTTP. Returns (record, url, deal)."""
+    url = normalize_deal_url(record["resolved_url"])
+    deal = scraper.scrape_deal_fast(url)
+    return record, url, deal
+
+
+def recover_data(workers: int = 8):
     db = StorageManager()
-    scraper = BrowserScraper(headless=True)
+    fast_scraper = FastScraper()
+    browser_scraper = BrowserScraper(headless=True)
 
     records = db.get_noisy_records()
 
@@ -17,36 +27,58 @@ def recover_data():
     print(f"[*] Found {len(records)} records requiring recovery. Starting re-scrape...")
 
     recovered_count = 0
-    for record in records:
-        resolved_id = record["resolved_id"]
-        resolved_url = record["resolved_url"]
-
-        # Apply normalization if missing in the logged URL
-        url = normalize_deal_url(resolved_url)
-
-        print(f"  [>] Processing {resolved_id} via {url}...")
-
-        try:
-            # Re-scrape using the full scraper logic
-            deal = scraper.scrape_deal_page(url)
-
-            if deal.has_error:
-                print(f"    [!] Error scraping {resolved_id}: {deal.error}")
+    scraped_deals = []
+    needs_browser = []
+
+    # Pass 1: parallel HTTP scrapes. The workload is network-bound, so the
+    # thread pool multiplies throughput; the scraper's per-host semaphore
+    # caps total concurrency against ozbargain regardless of worker count.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_fast_scrape, record, fast_scraper) for record in records]
+        for future in concurrent.futures.as_completed(futures):
+            record, url, deal = future.result()
+            if deal.has_error or deal.title in BOT_WALL_TITLES:
+                needs_browser.append((record, url))
                 continue
-
-            # Use upsert to fix the record
-            db.upsert_live_deal(deal)
-
-            # Check if title fixed
-            if deal.title not in BOT_WALL_TITLES:
-                print(f"    [+] Successfully recovered title: {deal.title}")
-                recovered_count += 1
-            else:
-                print(f"    [?] Title still generic: {deal.title}")
-
-        except Exception as e:
-            print(f"    [!!] Unexpected error for {resolved_id}: {e}")
-
+            print(f"    [+] Successfully recovered title: {deal.title}")
+            scraped_deals.append(deal)
+            recovered_count += 1
+
+    # Pass 2: anything the fast path could not get past (bot walls) retries
+    # serially with the full browser scraper.
+    if needs_browser:
+        print(f"[*] {len(needs_browser)} records need a browser re-scrape...")
+        # One persistent browser for the whole pass, released on exit
+        with browser_scraper:
+            for record, url in needs_browser:
+                resolved_id = record["resolved_id"]
+                print(f"  [>] Processing {resolved_id} via {url}...")
+
+                try:
+                    deal = browser_scraper.scrape_deal_page(url)
+
+                    if deal.has_error:
+                        print(f"    [!] Error scraping {resolved_id}: {deal.error}")
+                        continue
+
+                    # Collect for a single batched upsert at the end
+                    scraped_deals.append(deal)
+
+                    # Check if title fixed
+                    if deal.title not in BOT_WALL_TITLES:
+                        print(f"    [+] Successfully recovered title: {deal.title}")
+                        recovered_count += 1
+                    else:
+                        print(f"    [?] Title still generic: {deal.title}")
+
+                except Exception as e:
+                    print(f"    [!!] Unexpected error for {resolved_id}: {e}")
+
+    # Fix all records in one transaction instead of a commit per deal
+    if scraped_deals:
+        db.upsert_live_deals(scraped_deals)
+
+    db.close()
     print(f"\n[*] Data recovery complete. Recovered {recovered_count}/{len(records)} records.")
 
 
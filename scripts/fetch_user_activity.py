@@ -1,10 +1,39 @@
 import argparse
+import re
+import threading
 import time
 import concurrent.futures
-from typing import Dict
+from typing import Dict, Optional
 from ozbargain.core.scraper import BrowserScraper, FastScraper
 from ozbargain.db.manager import StorageManager
 
+# Activity refs derivable straight from the item URL, matching the refs
+# process_item stores (comment-<id> / node/<id>)
+_COMMENT_REF_RE = re.compile(r"(?:#comment-|/comment/)(\d+)")
+_NODE_REF_RE = re.compile(r"node/(\d+)")
+
+
+def _activity_ref_from_url(url: str) -> Optional[str]:
+    match = _COMMENT_REF_RE.search(url)
+    if match:
+        return f"comment-{match.group(1)}"
+    match = _NODE_REF_RE.search(url)
+    if match:
+        return f"node/{match.group(1)}"
+    return None
+
+# One FastScraper per worker thread: keeps the requests.Session (and its
+# keep-alive connections) alive across items instead of rebuilding it per URL.
+_thread_local = threading.local()
+
+
+def _get_scraper() -> FastScraper:
+    scraper = getattr(_thread_local, "scraper", None)
+    if scraper is None:
+        scraper = FastScraper()
+        _thread_local.scraper = scraper
+    return scraper
+
 
 def process_item(item: Dict, username: str, db: StorageManager):
     """
@@ -14,8 +43,8 @@ def process_item(item: Dict, username: str, db: StorageManager):
     url = item["url"]
     text = item["text"]
 
-    # 1. Init separate instances for thread safety
-    scraper = FastScraper()
+    # 1. Reuse the thread-local instance for thread safety without per-item setup cost
+    scraper = _get_scraper()
 
     try:
         # 2. Scrape Deal/Context (Fast Mode - Requests)
@@ -24,10 +53,7 @@ def process_item(item: Dict, username: str, db: StorageManager):
             print(f"[!] Error processing {url}: {deal.error}")
             return False
 
-        # 3. Store Deal Context (Mark as manual_fetch)
-        db.upsert_live_deal(deal, source="manual_fetch")
-
-        # 4. Store Activity
+        # 3. Determine Activity Content
         content = deal.linked_comment
         activity_type = "comment"
         activity_ref = deal.linked_comment_id
@@ -44,9 +70,10 @@ def process_item(item: Dict, username: str, db: StorageManager):
                 activity_ref = f"unknown-{int(time.time()*1000)}"
 
         if activity_ref and content:
-            db.log_user_activity(
+            # 4. Store Deal Context + Activity (single transaction, marked as manual_fetch)
+            db.archive_user_activity(
+                deal,
                 user_id=username,
-                deal_id=deal.id or "",
                 activity_ref=activity_ref,
                 content=content,
                 activity_type=activity_type,
@@ -54,6 +81,8 @@ def process_item(item: Dict, username: str, db: StorageManager):
             print(f"[+] Archived {activity_type}: {activity_ref} ({url})")
             return True
         else:
+            # Still store the deal context even if no activity content was extracted
+            db.upsert_live_deal(deal, source="manual_fetch")
             print(f"[?] skipping {url} - no content")
             return False
 
@@ -65,7 +94,9 @@ def process_item(item: Dict, username: str, db: StorageManager):
         pass
 
 
-def fetch_user_activity(username: str, limit: int = 50, workers: int = 8, headless: bool = True):
+def fetch_user_activity(
+    username: str, limit: int = 50, workers: int = 8, headless: bool = True, use_browser: bool = False
+):
     # Fast mode (requests) is light, so we can support more workers.
     if workers > 20:
         print(f"[!] Warning: {workers} threads is high. Be careful of rate limiting.")
@@ -75,24 +106,58 @@ def fetch_user_activity(username: str, limit: int = 50, workers: int = 8, headle
         print("[*] Running in HEADFUL mode (Browser Visible).")
 
     # Main Scraper for the Feed (Generator)
-    # This one drives the pagination loops
-    feed_scraper = BrowserScraper(headless=headless)
+    # Plain paginated HTTP by default; the Playwright infinite-scroll crawler
+    # is the opt-in fallback for when the feed sits behind a bot wall.
+    if use_browser:
+        feed_scraper = BrowserScraper(headless=headless)
+    else:
+        feed_scraper = FastScraper()
 
     print("[*] Fetching activity feed stream...")
 
     count_submitted = 0
     futures = []
 
+    # Completion counter fed by future callbacks: each worker bumps the count
+    # as it finishes, so the main thread only has to wait() at the end instead
+    # of draining results through an as_completed() loop.
+    completed_count = 0
+    count_lock = threading.Lock()
+
+    def _on_done(future: concurrent.futures.Future) -> None:
+        nonlocal completed_count
+        try:
+            success = future.result()
+        except Exception as e:
+            print(f"[!!] Worker raised: {e}")
+            success = False
+        if success:
+            with count_lock:
+                completed_count += 1
+
     # Main DB manager instantiated on main thread to avoid concurrent migration runs
     db = StorageManager()
 
+    # Resume support: refs archived by previous runs are skipped outright, so
+    # an interrupted fetch picks up where it left off without re-scraping.
+    archived_refs = db.get_archived_activity_refs(username)
+    if archived_refs:
+        print(f"[*] Resuming: {len(archived_refs)} items already archived for {username}.")
+    skipped_count = 0
+
     with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
         # Iterate over the generator
         for activity_item in feed_scraper.get_user_activity(username, max_items=limit):
+            ref = _activity_ref_from_url(activity_item["url"])
+            if ref and ref in archived_refs:
+                skipped_count += 1
+                continue
+
             count_submitted += 1
 
             # Submit to pool
             future = executor.submit(process_item, activity_item, username, db)
+            future.add_done_callback(_on_done)
             futures.append(future)
 
             # Optional: throttle submission if too fast?
@@ -102,14 +167,15 @@ def fetch_user_activity(username: str, limit: int = 50, workers: int = 8, headle
             if count_submitted % 10 == 0:
                 print(f"[*] Discovered {count_submitted} items so far...")
 
+        if skipped_count:
+            print(f"[*] Skipped {skipped_count} previously archived items.")
         print(f"[*] Finished discovery. Waiting for {len(futures)} tasks to complete...")
 
-        # Wait for all
-        completed_count = 0
-        for f in concurrent.futures.as_completed(futures):
-            if f.result():
-                completed_count += 1
+        # Wait for all (callbacks have already tallied the results)
+        concurrent.futures.wait(futures)
 
+    # Flush buffered history snapshots before exit
+    db.close()
     print(f"[*] All Done. Successfully archived {completed_count} items.")
 
 
@@ -119,6 +185,11 @@ if __name__ == "__main__":
     parser.add_argument("--limit", type=int, default=50, help="Max items to scrape")
     parser.add_argument("--workers", type=int, default=8, help="Concurrent threads (Default: 8)")
     parser.add_argument("--headful", action="store_true", help="Run browser in visible mode (debug)")
+    parser.add_argument(
+        "--browser", action="store_true", help="Crawl the feed with Playwright (fallback for bot walls)"
+    )
 
     args = parser.parse_args()
-    fetch_user_activity(args.username, args.limit, args.workers, headless=not args.headful)
+    fetch_user_activity(
+        args.username, args.limit, args.workers, headless=not args.headful, use_browser=args.browser or args.headful
+    )
@@ -84,22 +84,27 @@ def test_alert_history_caching(db):
     assert not db.has_alerted(deal_id, "keyword_match")
 
 
-def test_connection_context_manager_closes_on_error(db):
-    """
-    Verify that _get_connection closes the connection even if an exception occurs.
-    """
-    import sqlite3
-    from unittest.mock import MagicMock, patch
-
-    mock_conn = MagicMock(spec=sqlite3.Connection)
-    with patch("sqlite3.connect", return_value=mock_conn):
-        try:
-            with db._get_connection():
-                raise ValueError("Test error")
-        except ValueError:
-            pass
-
-    mock_conn.close.assert_called_once()
+def test_connection_is_persistent_and_rolls_back_on_error(db):
+    """
+    Verify that _get_connection reuses one shared connection and rolls back
+    any open transaction if an exception occurs inside the block.
+    """
+    with db._get_connection() as conn_a:
+        pass
+    with db._get_connection() as conn_b:
+        pass
+    assert conn_a is conn_b
+
+    try:
+        with db._get_connection() as conn:
+            conn.execute("INSERT INTO watched_tags (tag, is_active) VALUES ('temp_tag', 1)")
+            raise ValueError("Test error")
+    except ValueError:
+        pass
+
+    # The uncommitted insert must have been rolled back, and the shared
+    # connection must still be usable afterwards.
+    assert "temp_tag" not in db.get_watched_tags()
 
 
 def test_get_trending_deals(db):
@@ -0,0 +1,43 @@
+import time
+
+import pytest
+
+from ozbargain.utils.ratelimit import RateLimiter
+
+
+def test_burst_within_capacity_is_immediate():
+    limiter = RateLimiter(rate=1.0, capacity=5)
+
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.acquire()
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 0.1
+
+
+def test_blocks_until_refill_when_empty():
+    limiter = RateLimiter(rate=50.0, capacity=1)
+    limiter.acquire()  # drain the bucket
+
+    start = time.monotonic()
+    limiter.acquire()  # must wait ~1/50s for a token
+    elapsed = time.monotonic() - start
+
+    assert elapsed >= 0.01
+
+
+def test_context_manager_consumes_a_token():
+    limiter = RateLimiter(rate=1.0, capacity=2)
+
+    with limiter:
+        pass
+
+    assert limiter._tokens < 2
+
+
+def test_rejects_invalid_parameters():
+    with pytest.raises(ValueError):
+        RateLimiter(rate=0, capacity=1)
+    with pytest.raises(ValueError):
+        RateLimiter(rate=1.0, capacity=0)
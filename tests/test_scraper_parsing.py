@@ -97,7 +97,7 @@ def test_fast_scraper_parsing(fast_scraper, mocker):
     """
 
     mock_response = mocker.Mock()
-    mock_response.text = html_content
+    mock_response.content = html_content.encode()
     mock_response.url = "https://www.ozbargain.com.au/node/999999"
     mock_response.raise_for_status = mocker.Mock()
 
@@ -137,7 +137,7 @@ def test_ld_json_comment_count_fast(fast_scraper, mocker):
     </html>
     """
     mock_response = mocker.Mock()
-    mock_response.text = html_content
+    mock_response.content = html_content.encode()
     mock_response.url = "https://www.ozbargain.com.au/node/777777"
     mock_response.raise_for_status = mocker.Mock()
 
@@ -160,7 +160,7 @@ def test_fast_scraper_bot_wall(fast_scraper, mocker):
     </html>
     """
     mock_response = mocker.Mock()
-    mock_response.text = html_content
+    mock_response.content = html_content.encode()
     mock_response.url = "https://www.ozbargain.com.au/node/123456"
     mock_response.raise_for_status = mocker.Mock()
 
@@ -175,17 +175,20 @@ def test_browser_scraper_timeout_error_handling(mocker):
     # Mock playwright connection/launch
     mock_playwright = mocker.MagicMock()
     mock_browser = mocker.MagicMock()
+    mock_context = mocker.MagicMock()
     mock_page = mocker.MagicMock()
 
     mock_playwright.chromium.launch.return_value = mock_browser
-    mock_browser.new_page.return_value = mock_page
+    mock_browser.contexts = []
+    mock_browser.new_context.return_value = mock_context
+    mock_context.new_page.return_value = mock_page
     # Make page.goto raise an exception
     mock_page.goto.side_effect = Exception("Playwright navigation timeout")
 
-    # Patch sync_playwright to return our mock
+    # Patch sync_playwright so .start() returns our mock
     mocker.patch(
         "ozbargain.core.scraper.sync_playwright",
-        return_value=mocker.MagicMock(__enter__=mocker.MagicMock(return_value=mock_playwright)),
+        return_value=mocker.MagicMock(start=mocker.MagicMock(return_value=mock_playwright)),
     )
 
     scraper = BrowserScraper(headless=True, cdp_url=None)
@@ -195,7 +198,15 @@ def test_browser_scraper_timeout_error_handling(mocker):
     # Assertions
     assert result.has_error is True
     assert "Playwright navigation timeout" in result.error
-    # Ensure browser.close() was called to prevent leaks
+    # Ensure page.close() was called to prevent tab leaks
+    mock_page.close.assert_called_once()
+
+    # The persistent browser survives a navigation error and is reused...
+    scraper.scrape_deal_page("https://www.ozbargain.com.au/node/654321")
+    mock_playwright.chromium.launch.assert_called_once()
+
+    # ...and close() releases it
+    scraper.close()
     mock_browser.close.assert_called_once()
 
 
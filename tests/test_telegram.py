@@ -14,7 +14,7 @@ def test_telegram_mock_mode():
 
 def test_telegram_real_mode_success():
     with patch("ozbargain.notifier.telegram.settings") as mock_settings, \
-         patch("requests.post") as mock_post:
+         patch("requests.Session.post") as mock_post:
         mock_settings.telegram_bot_token = "fake_token"
         mock_settings.telegram_chat_id = "fake_chat_id"
 
@@ -43,7 +43,7 @@ def test_telegram_real_mode_success():
 
 def test_telegram_real_mode_failure():
     with patch("ozbargain.notifier.telegram.settings") as mock_settings, \
-         patch("requests.post") as mock_post:
+         patch("requests.Session.post") as mock_post:
         mock_settings.telegram_bot_token = "fake_token"
         mock_settings.telegram_chat_id = "fake_chat_id"
 
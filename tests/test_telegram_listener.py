@@ -17,6 +17,7 @@ def mock_notifier():
     notifier.bot_token = "12345:mock_token"
     notifier.chat_id = "987654321"
     notifier.enabled = True
+    notifier.session = MagicMock()
     return notifier
 
 
@@ -25,6 +26,7 @@ def test_listener_disabled(test_db):
     notifier.bot_token = None
     notifier.chat_id = None
     notifier.enabled = False
+    notifier.session = MagicMock()
     listener = TelegramListener(test_db, notifier)
     listener.start()
     assert listener._thread is None